@@ -0,0 +1,179 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+import solver
+
+# the variables of generated statements, one for every supported variable count
+VARIABLES = "abcdefghijklmnopqrstuvwx"
+VARIABLE_COUNTS = (1, 4, 8, 12, 16, 20, 24)
+# tables with more variables take too long and too much memory to be created on every run
+MAX_TABLE_VARIABLES = 16
+# slowdowns below this many seconds are ignored as they are mostly noise
+MIN_REGRESSION_SECONDS = 0.001
+
+STAGES = (
+    "pre_process_statement",
+    "create_method_tree",
+    "optimize_truth_table",
+    "run_method_tree",
+    "get_representational_string"
+)
+
+
+def wide_and(variables):
+    return " and ".join(variables)
+
+
+def deep_nesting(variables):
+    # every variable adds another level of brackets around everything before it
+    operators = ("and", "or", "if", "equal")
+    statement = variables[0]
+    for idx, variable in enumerate(variables[1:]):
+        statement = f"({statement} {operators[idx % len(operators)]} -{variable})"
+    # nest the statement further so the depth does not only depend on the number of variables
+    for idx in range(64):
+        statement = f"-({statement} {operators[idx % len(operators)]} {variables[idx % len(variables)]})"
+    return statement
+
+
+def xor_chain(variables):
+    return " xor ".join(variables)
+
+
+def repeated_subformulas(variables):
+    # the same few sub statements appear over and over which interning and caching should take advantage of
+    parts = [f"(({a} and {b}) or -({a} nand {b}))" for a, b in zip(variables, variables[1:] + variables[:1])]
+    return " or ".join(parts * 4)
+
+
+FAMILIES = {
+    "wide_and": wide_and,
+    "deep_nesting": deep_nesting,
+    "xor_chain": xor_chain,
+    "repeated_subformulas": repeated_subformulas
+}
+
+
+def measure(function, repeat):
+    """ Runs a function multiple times and returns the fastest time and its result
+
+    :param function: The function to run without any arguments.
+    :param repeat: The number of runs.
+    :return: The fastest time in seconds and the result of the last run.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def run_case(statement, repeat, create_table=True):
+    """ Times every stage of creating the truth table of a statement separately
+
+    Every stage gets the result of the stage before it as its input.
+
+    :param statement: The statement to benchmark.
+    :param repeat: The number of runs of every stage.
+    :param create_table: If the table should be created and rendered.
+    :return: A dictionary mapping every stage to its fastest time in seconds.
+    """
+    times = {}
+    times["pre_process_statement"], pre_processed = measure(
+        lambda: solver.pre_process_statement(statement), repeat
+    )
+    times["create_method_tree"], (variables, tree) = measure(lambda: solver.create_method_tree(pre_processed), repeat)
+    times["optimize_truth_table"], tree = measure(lambda: solver.optimize_truth_table(tree), repeat)
+    if create_table:
+        times["run_method_tree"], table = measure(
+            lambda: solver.run_method_tree(tree, solver.generate_truth_values(variables), variables), repeat
+        )
+        times["get_representational_string"], _ = measure(
+            lambda: solver.get_representational_string(table, tree), repeat
+        )
+    return times
+
+
+def run_benchmarks(repeat=3, variable_counts=VARIABLE_COUNTS, max_table_variables=MAX_TABLE_VARIABLES):
+    """ Runs all formula families for all variable counts
+
+    :param repeat: The number of runs of every stage.
+    :param variable_counts: The variable counts to generate statements for.
+    :param max_table_variables: Statements with more variables are only parsed and optimized.
+    :return: The results in the format written to the json file.
+    """
+    cases = {}
+    for family, generate in FAMILIES.items():
+        for count in variable_counts:
+            name = f"{family}/{count}"
+            statement = generate(list(VARIABLES[:count]))
+            cases[name] = run_case(statement, repeat, count <= max_table_variables)
+            print(f"{name:<28}" + " ".join(
+                f"{cases[name][stage]:10.6f}" if stage in cases[name] else f"{'-':>10}" for stage in STAGES
+            ))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "cases": cases
+    }
+
+
+def find_regressions(results, baseline, tolerance=0.25):
+    """ Compares results to a baseline and returns every stage which got slower
+
+    :param results: The new results.
+    :param baseline: The results to compare to.
+    :param tolerance: How much slower a stage may get before it is flagged, 0.25 being 25%.
+    :return: A list of the case, the stage, the baseline time and the new time of every regression.
+    """
+    regressions = []
+    for name, times in results["cases"].items():
+        old_times = baseline["cases"].get(name, {})
+        for stage, new in times.items():
+            old = old_times.get(stage)
+            if old is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > MIN_REGRESSION_SECONDS:
+                regressions.append((name, stage, old, new))
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmarks every stage of creating truth tables.")
+    parser.add_argument("--output", default="benchmark.json", help="the json file to write the results to")
+    parser.add_argument("--baseline", help="a json file of an earlier run to compare the results to")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="the allowed slowdown, 0.25 being 25%%")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of runs of every stage")
+    parser.add_argument(
+        "--max-table-variables", type=int, default=MAX_TABLE_VARIABLES,
+        help="statements with more variables are only parsed and optimized"
+    )
+    arguments = parser.parse_args(arguments)
+
+    print(f"{'case':<28}" + " ".join(f"{stage[:10]:>10}" for stage in STAGES))
+    results = run_benchmarks(arguments.repeat, max_table_variables=arguments.max_table_variables)
+    with open(arguments.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, arguments.tolerance)
+        for name, stage, old, new in regressions:
+            print(f"REGRESSION {name} {stage}: {old:.6f}s -> {new:.6f}s ({new / old:.2f}x)")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
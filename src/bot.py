@@ -1,10 +1,13 @@
 from discord.ext import commands
-import os
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import gzip
+import io
 import discord
+import threading
 import traceback
 from src import solver
 import configparser
-import random
 
 config = configparser.ConfigParser()
 config.read("config.ini")
@@ -13,61 +16,212 @@ sections = config.sections()
 owner_id = int(config.get("BOT", "owner_id", fallback=None))
 command_prefix = config.get("BOT", "command_prefix", fallback="#")
 token = config.get("BOT", "token", fallback=None)
-# TODO: implement any of these option
-caching = config.get("CACHING", "use_caching", fallback=True)
+solve_workers = config.getint("BOT", "solve_workers", fallback=4)
+solves_per_user = config.getint("BOT", "solves_per_user", fallback=2)
+solve_timeout = config.getfloat("BOT", "solve_timeout", fallback=30)
+compression_threshold = config.getint("BOT", "compression_threshold", fallback=1000000)
+caching = config.getboolean("CACHING", "use_caching", fallback=True)
 caching_dir = config.get("CACHING", "caching_dir", fallback="cached")
+max_cache_size = config.getint("CACHING", "max_cache_size", fallback=solver.RESULT_CACHE_SIZE)
 
+cache = solver.ResultCache(caching_dir, max_cache_size) if caching else None
 
 client = commands.Bot(command_prefix=command_prefix, owner_id=owner_id)
 
+# solves run in these threads so the event loop stays free to answer the gateway and other commands
+executor = ThreadPoolExecutor(max_workers=solve_workers)
+# the number of solves every user currently has running by their id
+running_solves = {}
+# characters times rows which can roughly be rendered per second, used to estimate how long a statement takes
+COST_PER_SECOND = 2000000
+MIN_TIMEOUT = 2
+
+# the metrics of all solves since the bot started which the stats command shows
+solve_metrics = solver.SolverMetrics()
+solve_metrics_lock = threading.Lock()
+
+creator = None
+
+
+class SolveLimitError(Exception):
+    pass
+
+
+async def get_creator():
+    global creator
+    if creator is None:
+        creator = await client.fetch_user(286907674531201025)
+    return creator
+
+
+def estimate_seconds(statement):
+    """ Estimates how long it takes to render the truth table of a pre-processed statement
+
+    :param statement: The pre-processed statement.
+    :return: The estimated number of seconds.
+    """
+    variable_count = len(set(statement).difference(solver.SPECIAL_CHARACTERS))
+    return (len(statement) << variable_count) / COST_PER_SECOND
+
+
+async def run_solver(ctx, function, *args, estimated=None):
+    """ Runs a blocking solver function in the executor
+
+    Every user can only run solves_per_user solves at the same time. Functions get a threading.Event as their last
+    argument which is set once they take longer than twice the estimated time or solve_timeout and should stop them.
+
+    :param ctx: The context of the command.
+    :param function: The function to run.
+    :param args: The arguments to pass.
+    :param estimated: The estimated number of seconds the function takes, if known.
+    :return: The result of the function.
+    """
+    user_id = ctx.author.id
+    if running_solves.get(user_id, 0) >= solves_per_user:
+        raise SolveLimitError(f"You can only run {solves_per_user} solves at the same time.")
+    if estimated is not None and estimated > solve_timeout:
+        raise SolveLimitError(f"The statement is too big to solve within {solve_timeout:g} seconds.")
+
+    cancel = threading.Event()
+    running_solves[user_id] = running_solves.get(user_id, 0) + 1
+    try:
+        future = client.loop.run_in_executor(executor, function, *args, cancel)
+        timeout = solve_timeout if estimated is None else min(solve_timeout, MIN_TIMEOUT + 2 * estimated)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            cancel.set()
+            raise SolveLimitError(f"Solving the statement took longer than {timeout:.1f} seconds.") from None
+    finally:
+        running_solves[user_id] -= 1
+        if not running_solves[user_id]:
+            del running_solves[user_id]
+
+
+def create_attachment(string):
+    """ Encodes a message too long to send as text, compressing it if it is bigger than compression_threshold bytes
+
+    :param string: The message.
+    :return: The content and the name of the file.
+    """
+    data = string.encode("utf-8")
+    if len(data) > compression_threshold:
+        return gzip.compress(data), "truth_table.txt.gz"
+    return data, "truth_table.txt"
+
+
+def record_metrics(metrics):
+    with solve_metrics_lock:
+        solve_metrics.merge(metrics)
+
+
+def create_table_string(pre_processed, cancel):
+    metrics = solver.SolverMetrics()
+    try:
+        with metrics.stage("result_cache_get"):
+            string = cache.get(pre_processed, optimize=False) if cache else None
+        if string is not None:
+            metrics.add("result_cache_hits")
+            return string
+
+        metrics.add("result_cache_misses")
+        with metrics.stage("create_method_tree"):
+            variables, method_tree = solver.create_method_tree(pre_processed)
+        # method_tree = solver.optimize_truth_table(method_tree)
+        metrics.add("variables", len(variables))
+        metrics.add("nodes", len(solver.get_nodes(method_tree)))
+
+        with metrics.stage("render"):
+            rows = solver.iter_until_cancelled(
+                solver.iter_method_tree_rows(method_tree, variables), cancel, pre_processed
+            )
+            string = "".join(solver.iter_representational_string(variables, method_tree, rows))
+        metrics.add("rows", 1 << len(variables))
+        metrics.peak("table_characters", len(string))
+        if cache:
+            with metrics.stage("result_cache_put"):
+                cache.put(pre_processed, string, optimize=False)
+        return string
+    finally:
+        metrics.add("solves")
+        record_metrics(metrics)
+
+
+def check_statement(statement, mode, cancel):
+    metrics = solver.SolverMetrics()
+    try:
+        with metrics.stage("check"):
+            return solver.check(statement, mode, True, cancel)
+    finally:
+        metrics.add("checks")
+        record_metrics(metrics)
+
 
 @client.command(aliases=[""])
 async def solve(ctx, *args):
     try:
         statement = " ".join(args)
         pre_processed = solver.pre_process_statement(" ".join(args))
-        solver.get_matching_brackets(pre_processed)
-        variables, method_tree = solver.create_method_tree(pre_processed)
-        # method_tree = solver.optimize_truth_table(method_tree)
 
-        # optimized_statement = solver.reconstruct_from_tree(method_tree)
-        table = solver.generate_truth_values(variables)
-        table = solver.run_method_tree(method_tree, table, variables)
-        pre_processed = pre_processed.replace(solver.EQUAL_SIGN, "\\" + solver.EQUAL_SIGN)
+        string = await run_solver(ctx, create_table_string, pre_processed, estimated=estimate_seconds(pre_processed))
+        displayed = pre_processed.replace(solver.EQUAL_SIGN, "\\" + solver.EQUAL_SIGN)
         # optimized_statement = solver.reconstruct_from_tree(method_tree)
 
         embed = discord.Embed(
             title="Truth Table Creator",
-            description=f"Original Statement: {statement}\nStatement: {pre_processed}",  #\nOptimized: {optimized_statement}",
+            description=f"Original Statement: {statement}\nStatement: {displayed}",  #\nOptimized: {optimized_statement}",
             color=discord.Color.green()
         )
-        creator = await client.fetch_user(286907674531201025)
+        creator = await get_creator()
 
         embed.set_footer(
             text=f"Made by {creator}.",
             icon_url=creator.avatar_url
         )
         await ctx.send(embed=embed)
-        string = solver.get_representational_string(table)
     except solver.SolverException as e:
         string = e.error_message
+    except SolveLimitError as e:
+        string = str(e)
     except BaseException as e:
         # TODO: catch different exceptions and provide better information
         string = traceback.format_exc()
 
     if len(string) + 8 > 2000:
-        # TODO: use tempfile
-        fp = f"cached/{random.randint(1, 1000)}.txt"
-        with open(fp, "rw+") as f:
-            f.write(string)
-            await ctx.send(
-                "```The message was too long so it was put in this file.```",
-                file=discord.File(fp, fp.lstrip("cached/"))
-            )
-
-        os.remove(fp)
+        data, filename = await client.loop.run_in_executor(executor, create_attachment, string)
+        await ctx.send(
+            "```The message was too long so it was put in this file.```",
+            file=discord.File(io.BytesIO(data), filename)
+        )
     else:
         await ctx.send(f"```\n{string}```")
 
 
+@client.command()
+@commands.is_owner()
+async def clear_cache(ctx):
+    removed = cache.clear() if cache else 0
+    await ctx.send(f"```\nRemoved {removed} cached truth tables.```")
+
+
+@client.command()
+@commands.is_owner()
+async def stats(ctx):
+    with solve_metrics_lock:
+        string = solve_metrics.report()
+    await ctx.send(f"```\n{string or 'Nothing was solved yet.'}```")
+
+
+@client.command()
+async def check(ctx, mode, *args):
+    try:
+        result = await run_solver(ctx, check_statement, " ".join(args), mode)
+        string = f"{mode}: {result}"
+    except solver.SolverException as e:
+        string = e.error_message
+    except (SolveLimitError, ValueError) as e:
+        string = str(e)
+    await ctx.send(f"```\n{string}```")
+
+
 client.run(token)
@@ -1,6 +1,25 @@
+import contextlib
+import cProfile
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
 import math
+import os
+import pstats
 import sys
+import tempfile
+import threading
+import time
 import traceback
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # TODO: make index optional for exceptions as it confuses the end user
 
@@ -21,6 +40,16 @@ class InvalidCharacterException(SolverException):
         super().__init__(expression, idx, message, "InvalidCharacterException")
 
 
+class CancelledException(SolverException):
+    def __init__(self, expression, message="solving the statement was cancelled"):
+        super().__init__(expression, 0, message, "CancelledException")
+
+
+class NodeLimitException(SolverException):
+    def __init__(self, expression, message="the decision diagram needs too many nodes"):
+        super().__init__(expression, 0, message, "NodeLimitException")
+
+
 TRUE_SIGN = "1"
 FALSE_SIGN = "0"
 NOT_SIGN = "¬"
@@ -82,9 +111,29 @@ BRACKETS = [
     CLOSING_BRACKET
 ]
 
-VALUES = {}
 RESULTS = []
-VERBOSITY = False
+
+
+class EvaluationState(threading.local):
+    """ The values of the variables NORMAL reads while run_method_tree calls the gates, separate for every thread """
+
+    def __init__(self):
+        self.values = {}
+
+
+EVALUATION_STATE = EvaluationState()
+
+# "table" runs the method tree once per row while "bitmask" evaluates every gate once for all rows
+# "numpy" does the same on packed numpy arrays and falls back to "table" when numpy is not installed
+# "parallel" splits the rows into blocks which are evaluated like "bitmask" in multiple processes
+# "gray" walks the rows in gray code order and only updates the nodes depending on the single variable which changed
+ENGINES = (
+    "table",
+    "bitmask",
+    "numpy",
+    "parallel",
+    "gray"
+)
 
 # TODO: better documenting for the gates (more consistency)
 
@@ -104,8 +153,8 @@ def FALSE():
 
 
 def NORMAL(var):
-    """Returns an actual value read from VALUES this method will always be last when running the method tree"""
-    res = VALUES[var]
+    """Returns the value of the variable in the EVALUATION_STATE of this thread, always last in the method tree"""
+    res = EVALUATION_STATE.values[var]
     return res, conv(res)
 
 
@@ -137,7 +186,7 @@ def OR(var):
     """Checks if any result is true"""
     res1, s1 = var[0][0](*var[0][1:])
     res2, s2 = var[1][0](*var[1][1:])
-    res = res1 and res2
+    res = res1 or res2
     return res, f" {s1} {conv(res)} {s2} "
 
 
@@ -217,270 +266,200 @@ OPERATOR_HIERARCHY = [
     UNEQUAL_SIGN
 ]
 
+# the later an operator appears in OPERATOR_HIERARCHY the stronger it binds
+OPERATOR_BINDING = {operator: idx for idx, operator in enumerate(OPERATOR_HIERARCHY)}
+
+OPERATOR_FUNCTIONS = {
+    AND_SIGN: AND,
+    NAND_SIGN: NAND,
+    OR_SIGN: OR,
+    NOR_SIGN: NOR,
+    XOR_SIGN: XOR,
+    IF_SIGN: IF,
+    EQUAL_SIGN: EQUAL,
+    UNEQUAL_SIGN: UNEQUAL
+}
 
-def remove_redundant_negations(string):
-    """ Removes any doubled negations in the string
 
-    :param string: The string to process.
-    :return: The processed string.
+def get_node_key(tree):
+    """ Returns a key which is equal for two nodes if they are structurally equal and their children are interned
+
+    :param tree: The node to get the key of.
+    :return: The hashable key.
     """
-    string_length = len(string)
-    idx = 0
-    while idx < string_length:
-        if string[idx] == NOT_SIGN:
-            # check for the next position and check if it is also a negation if so remove both
-            if idx + 1 <= string_length and string[idx + 1] == NOT_SIGN:
-                string = string[0:idx] + string[idx + 2:string_length]
-                idx -= 2
-                string_length -= 2
-                if idx < 0:
-                    idx = 0
-                continue
+    operator = tree[0]
+    if operator == NORMAL:
+        return operator, tree[1]
+    elif operator == NOT:
+        return operator, id(tree[1])
+    elif operator in (TRUE, FALSE):
+        return operator,
+    return operator, id(tree[1][0]), id(tree[1][1])
 
-        idx += 1
-    return string
 
+def intern_node(nodes, tree):
+    """ Returns the node in nodes which is structurally equal to the given one and stores it there if there is none
 
-def check_surrounded(string):
-    """ Check if the string as a whole is surrounded by brackets
+    The children of the node have to be interned in the same dictionary already.
 
-    :param string: The string to check.
-    :return: True if it is surrounded.
+    :param nodes: The dictionary storing all interned nodes by their key.
+    :param tree: The node to intern.
+    :return: The interned node.
     """
-    length = len(string)
-    if length <= 1:
-        return False
-
-    counter = 0
-    for idx in range(length):
-        char = string[idx]
-        if char == OPENING_BRACKET:
-            counter += 1
-        elif char == CLOSING_BRACKET:
-            counter -= 1
+    return nodes.setdefault(get_node_key(tree), tree)
 
-        # return the string if we exited all brackets but have not looped through the entire string
-        # meaning there are no more brackets around the entire string
-        if counter == 0 and idx != length - 1:
-            return False
-    return True
 
+def intern_method_tree(tree, nodes=None):
+    """ Turns a method tree into a graph in which every structurally equal sub tree is only stored once
 
-def polish_statement(string):
-    """ Removes any brackets and negations containing the entire string
+    Nodes are never changed, new ones are created for every sub tree which is not interned yet so this is safe to
+    use on trees shared with others.
 
-    :param string: The string to process.
-    :return: If the statement was negated and the processed string.
+    :param tree: The tree to intern.
+    :param nodes: The dictionary storing all interned nodes, a new one is used if None.
+    :return: The interned tree.
     """
-
-    negated = False
-    length = len(string)
-    if length <= 2:
-        return string.startswith(NOT_SIGN), string
-    while True:
-        # brackets or negations containing the entire string will always have to be on 0 index position
-        char = string[0]
-
-        to_check = string
-        if char == NOT_SIGN:
-            to_check = to_check[1:]
-
-        surrounded = check_surrounded(to_check)
-        if surrounded:
-            if char == NOT_SIGN:
-                negated = not negated
-                string = string[1:]
-                length -= 1
-            string = string[1:length - 1]
-            length -= 2
+    if nodes is None:
+        nodes = {}
+    # maps the id of every original node to its interned copy
+    interned = {}
+    for node in get_nodes(tree):
+        operator = node[0]
+        if operator == NOT:
+            copy = [NOT, interned[id(node[1])]]
+        elif operator in (NORMAL, TRUE, FALSE):
+            copy = list(node)
         else:
-            return negated, string
+            copy = [operator, [interned[id(node[1][0])], interned[id(node[1][1])]]]
+        interned[id(node)] = intern_node(nodes, copy)
+    return interned[id(tree)]
+
+
+def negate(tree, nodes=None):
+    """ Negates a method tree removing the negation instead should the tree already be negated
+
+    :param tree: The tree to negate.
+    :param nodes: The dictionary of interned nodes to intern the negation in, if any.
+    :return: The negated tree.
+    """
+    if tree[0] == NOT:
+        return tree[1]
+    if nodes is None:
+        return [NOT, tree]
+    return intern_node(nodes, [NOT, tree])
 
 
 def create_method_tree(string):
-    """ Creates a method_tree from a checked string using recursion
+    """ Creates a method_tree from a checked string in a single pass without using recursion
 
     Creates a list which contains a method at index 0 and a list at 1 index which stores two lists of the same type.
-    A given string should contain both sides in brackets as no operator hierarchy is accounted for. It works by
-    extracting both sides of the statement and afterwards checking if they are variables if not it will call
-    itself again to get the necessary method tree.
+    Works like the shunting-yard algorithm by keeping a stack of finished sub trees and a stack of operators which
+    still wait for their right side. Operators earlier in OPERATOR_HIERARCHY bind the loosest and operators of the
+    same kind are grouped from the right, negations only apply to the variable or bracket following them. Sub trees
+    are interned so a sub statement occurring multiple times is only stored and evaluated once. Brackets are matched
+    while parsing so no separate pass of get_matching_brackets is needed to find errors regarding them.
 
     :param string: The statement for which a method tree should be constructed.
     :return: Any variables found and the method tree.
     """
+    variables = []
+    found = set()
+    operands = []
+    # contains the index of every operator as well so errors can point at it
+    operators = []
+    # every sub tree is interned while it is created so repeated parts of the statement share their nodes
+    nodes = {}
+
+    def reduce():
+        operator, _ = operators.pop()
+        second = operands.pop()
+        first = operands.pop()
+        operands.append(intern_node(nodes, [OPERATOR_FUNCTIONS[operator], [first, second]]))
+
+    def apply_negations():
+        while operators and operators[-1][0] == NOT_SIGN:
+            operators.pop()
+            operands.append(negate(operands.pop(), nodes))
+
+    expect_operand = True
+    for idx, char in enumerate(string):
+        if expect_operand:
+            if char == NOT_SIGN or char == OPENING_BRACKET:
+                operators.append((char, idx))
+                continue
+            elif char == CLOSING_BRACKET and operators and operators[-1] == (OPENING_BRACKET, idx - 1):
+                raise InvalidBracketException(string, idx, "empty brackets")
+            elif char in OPERATORS or char == CLOSING_BRACKET:
+                raise InvalidCharacterException(string, idx, "expected variable")
+            elif char == TRUE_SIGN:
+                operands.append(intern_node(nodes, [TRUE]))
+            elif char == FALSE_SIGN:
+                operands.append(intern_node(nodes, [FALSE]))
+            else:
+                if char not in found:
+                    found.add(char)
+                    variables.append(char)
+                operands.append(intern_node(nodes, [NORMAL, char]))
+            apply_negations()
+            expect_operand = False
 
-    negated, string = polish_statement(string)
-    length = len(string)
-    if length <= 2:
-        stripped = string.lstrip(NOT_SIGN)
-        # check if the string is a constant
-        if string == TRUE_SIGN:
-            stripped = None
-            args = [TRUE]
-        elif string == FALSE_SIGN:
-            stripped = None
-            args = [FALSE]
-        else:
-            args = [NORMAL, stripped]
-
-        if negated:
-            stripped = string.lstrip(NOT_SIGN)
-            return stripped, [
-                NOT, args
-            ]
-        else:
-            return stripped, args
-
-    # TODO: fix danger coming from rogues characters
-    # incremented every time we pass a OPENING_BRACKET and decremented every time we pass a CLOSING_BRACKET
-    # when this is 0 it means we have exited all brackets
-    operators = {}
-    bracket_counter = 0
-    idx = 0
-
-    while idx < length - 1:
-        char = string[idx]
-
-        if char == OPENING_BRACKET:
-            bracket_counter += 1
         elif char == CLOSING_BRACKET:
-            bracket_counter -= 1
-
-        if char != NOT_SIGN and bracket_counter == 0:
-            # we have exited all brackets the next char should be an operator
-            operator = string[idx + 1]
-            operators[idx + 1] = operator
-            if operator not in OPERATORS:
-                raise InvalidCharacterException(string, idx, "expected operator")
-            idx += 1
-            bracket_counter = 0
-        idx += 1
-
-    operator = None
-    first_statement = None
-    second_statement = None
-    break_second_loop = True
-    i = 0
-    length = len(OPERATOR_HIERARCHY)
-    # extract the correct operator to use minding the operator hierarchy
-    while break_second_loop and i < length:
-        operator = OPERATOR_HIERARCHY[i]
-        for idx in operators:
-            if operators[idx] == operator:
-                # we have found the right operator
-                first_statement = string[:idx]
-                second_statement = string[idx + 1:]
-                operator = operators[idx]
-                break_second_loop = False
-                break
-        i += 1
+            while operators and operators[-1][0] != OPENING_BRACKET:
+                reduce()
+            if not operators:
+                raise InvalidBracketException(string, idx, "missing matching opening bracket")
+            operators.pop()
+            apply_negations()
 
-    # stores any negations because they will be removed in polish_statement
-    methods_list = []
-    variables = []
-    statements = [first_statement, second_statement]
-
-    # loops through the statements and checks if they are only the length of one which means it is a variable
-    # if so it appends the NORMAL method which is the only method returning a boolean value
-    # if not it pareses the string again by calling itself and then adds this sub_tree to the current tree
-
-    for statement in statements:
-        sub_variables, sub_tree = create_method_tree(statement)
-        # TODO: use a set instead of a list to avoid checking for duplicates
-        if sub_variables is not None:
-            for i in sub_variables:
-                if i not in variables:
-                    variables.append(i)
-        methods_list.append(sub_tree)
-
-    # finds the correct operator to use and stores the method without calling it
-    # TODO: find a better way to do this
-    if operator not in OPERATORS:
-        raise InvalidCharacterException(string, idx + len(first_statement) + 1, "expected operator")
-    elif operator == AND_SIGN:
-        func = AND
-    elif operator == OR_SIGN:
-        func = OR
-    elif operator == XOR_SIGN:
-        func = XOR
-    elif operator == IF_SIGN:
-        func = IF
-    elif operator == EQUAL_SIGN:
-        func = EQUAL
-    elif operator == UNEQUAL_SIGN:
-        func = UNEQUAL
-    elif operator == NAND_SIGN:
-        func = NAND
-    elif operator == NOR_SIGN:
-        func = NOR
-    else:
-        raise Exception("reached end of operator checker without conclusion")
+        elif char in OPERATOR_FUNCTIONS:
+            binding = OPERATOR_BINDING[char]
+            while operators and operators[-1][0] in OPERATOR_FUNCTIONS and OPERATOR_BINDING[operators[-1][0]] > binding:
+                reduce()
+            operators.append((char, idx))
+            expect_operand = True
 
-    if negated:
-        return variables, [
-            NOT, [
-                func,
-                methods_list
-            ]
-        ]
-    else:
-        return variables, [
-            func,
-            methods_list
-        ]
+        else:
+            raise InvalidCharacterException(string, idx, "expected operator")
+
+    if expect_operand:
+        raise InvalidCharacterException(string, len(string), "expected variable")
+    # the outermost bracket which was never closed is reported as it is the one a user has to look for first
+    unclosed = next((idx for char, idx in operators if char == OPENING_BRACKET), None)
+    if unclosed is not None:
+        raise InvalidBracketException(string, unclosed, "missing matching closing bracket")
+    while operators:
+        reduce()
+    return variables, operands[0]
 
 
 def get_matching_brackets(string):
     """ Returns a dictionary of matching brackets also checks for any syntax errors regarding brackets
 
-    Works by adding every OPENING_BRACKET index to a dictionary as a key. When finding a CLOSING_BRACKET it searches
-    for the highest key which has not yet been assigned a CLOSING_BRACKET index if it finds one it assigns it. Should
-    it encounter any discrepancies a InvalidBracketException is raised.
+    Works by adding every OPENING_BRACKET index to a dictionary as a key and pushing it onto a stack. When finding a
+    CLOSING_BRACKET the last opened bracket is taken from the stack and assigned the index. Should it encounter any
+    discrepancies a InvalidBracketException is raised.
 
     :param string: The string to create this dictionary for.
     :return: The dictionary having all `OPENING_BRACKETS` as keys and their `CLOSING_BRACKETS` as values
     """
     dic = {}
-    for idx in range(len(string)):
-        char = string[idx]
+    stack = []
+    for idx, char in enumerate(string):
         if char == OPENING_BRACKET:
             dic[idx] = -1
+            stack.append(idx)
         elif char == CLOSING_BRACKET:
-            if not dic:
+            if not stack:
                 raise InvalidBracketException(string, idx, "missing matching opening bracket")
-            else:
-                for entry in reversed(dic.keys()):
-                    if dic[entry] == -1:
-                        if entry == idx - 1:
-                            raise InvalidBracketException(string, idx, "empty brackets")
-                        dic[entry] = idx
-                        break
-                else:
-                    raise InvalidBracketException(string, idx, "missing matching opening bracket")
-    for entry in dic:
-        if dic[entry] == -1:
-            raise InvalidBracketException(string, entry, "missing matching closing bracket")
+            entry = stack.pop()
+            if entry == idx - 1:
+                raise InvalidBracketException(string, idx, "empty brackets")
+            dic[entry] = idx
+    if stack:
+        raise InvalidBracketException(string, stack[0], "missing matching closing bracket")
     return dic
 
 
-def replace_with_conform_operators(string):
-    """ Replaces all keywords found in REPLACING_DICTIONARY with their corresponding operator
-
-    Loops through every key in REPLACING_DICTIONARY and splits. It then loops through the splitted list
-    to replace all occurrences of every element in this list with the corresponding one character operator.
-
-    :param string: The string to replace in.
-    :return: The processed string.
-    """
-
-    # TODO: Accept the replacing dictionary as parameter
-    for replace_string in REPLACING_DICTIONARY.keys():
-        replace_list = replace_string.split()
-        for replace in replace_list:
-            string = string.replace(replace, REPLACING_DICTIONARY[replace_string])
-    return string
-
-
 def generate_truth_values(variables):
     """ Generates a 2 dimensional array which contains an empty truth table
 
@@ -514,287 +493,2941 @@ def generate_truth_values(variables):
     return truth_table
 
 
-def run_method_tree(tree, table, variables):
+def run_method_tree(tree, table, variables, compiled=True, metrics=None, intermediate=True, cache=None):
     """ Runs a method tree and fills an empty truth table with the given values
 
     :param tree: The tree to run.
     :param table: The truth table to fill and use.
     :param variables: The variables present in the statement.
+    :param compiled: If the tree should be compiled into a function first instead of calling every gate.
+    :param metrics: The SolverMetrics to count cache hits and misses of compiled trees in, if any.
+    :param intermediate: If the intermediate strings should be created, otherwise None is stored in their place
+        and they are only created once a row is rendered. Only used if the tree is compiled.
+    :param cache: The LRUCache to store the compiled tree in, defaults to COMPILED_TREES.
     :return: The filled out truth table.
     """
-    global VALUES
     variable_count = len(variables)
+    if compiled:
+        evaluate = compile_method_tree(tree, variables, intermediate, metrics, cache)
+        # zip does not produce the single empty row a table without variables has
+        rows = zip(*(table[column][1:] for column in range(variable_count))) if variable_count else [()]
+        result_table = table[variable_count]
+        if intermediate:
+            for step, values in enumerate(rows):
+                res, s = evaluate(*values)
+                result_table[step] = s, res
+        else:
+            for step, values in enumerate(rows):
+                result_table[step] = None, evaluate(*values)
+        return table
+
+    values = EVALUATION_STATE.values
     for step in range(int(math.pow(2, variable_count))):
         for column in range(variable_count):
-            VALUES[table[column][0]] = table[column][step + 1]
+            values[table[column][0]] = table[column][step + 1]
         res, s = tree[0](*tree[1:])
         table[variable_count][step] = s, res
     return table
 
 
-def pre_process_statement(string):
-    """ Removes whitespaces, replaces operators, removes double negations, etc.
+def get_children(tree):
+    """ Returns the sub trees of a node in the order they are evaluated
 
-    :param string: The string to process.
-    :return: The processed string.
+    :param tree: The node to get the sub trees of.
+    :return: A list of all sub trees, empty for variables and constants.
     """
-    string = replace_with_conform_operators(string)
-    string = string.lower().replace(" ", "").strip().rstrip(NOT_SIGN)
-    string = remove_redundant_negations(string)
-    return string
+    operator = tree[0]
+    if operator == NOT:
+        return [tree[1]]
+    elif operator in (NORMAL, TRUE, FALSE):
+        return []
+    return tree[1]
 
 
-def apply_de_morgan(tree):
-    pass
+def get_nodes(tree):
+    """ Returns every node of a method tree exactly once with all children placed before their parents
 
+    Uses an explicit stack instead of recursion so that deep trees do not hit the recursion limit. Nodes are told
+    apart by their identity so a sub tree which is referenced multiple times is only returned once.
 
-def get_variables(tree):
-    operator = tree[0]
-    if operator == NORMAL:
-        return {tree[1]}
-    elif operator == NOT:
-        return get_variables(tree[1])
-    elif operator in (TRUE, FALSE):
-        return set({})
-    else:
-        variables1 = get_variables(tree[1][0])
-        variables2 = get_variables(tree[1][1])
-        return variables1 | variables2
+    :param tree: The tree to walk.
+    :return: A list of all nodes in post order.
+    """
+    nodes = []
+    visited = set()
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in visited:
+            continue
+        if expanded:
+            visited.add(id(node))
+            nodes.append(node)
+        else:
+            stack.append((node, True))
+            for child in reversed(get_children(node)):
+                stack.append((child, False))
+    return nodes
 
 
-def replace_with_same_resulting_operators(tree):
-    if tree[0] == NORMAL:
-        return tree
-    elif tree[0] == NOT:
-        tree[1] = replace_with_same_resulting_operators(tree[1])
-    else:
-        tree[1][0] = replace_with_same_resulting_operators(tree[1][0])
-        tree[1][1] = replace_with_same_resulting_operators(tree[1][1])
-    variables = list(get_variables(tree))
-
-    table = generate_truth_values(variables)
-    table = run_method_tree(tree, table, variables)
-    tree_result = table[-1]
-    if len(variables) == 2:
-        # if there are two variables the truth table will contain 3 columns
-        for idx in range(len(OPERATOR_RESULTS)):
-            operator_result = OPERATOR_RESULTS[idx]
-            if tree_result == operator_result:
-                operator = OPERATOR_RESULTS_OPERATORS[idx]
-                if operator == FALSE:
-                    tree = [FALSE]
-                elif operator == TRUE:
-                    tree = [TRUE]
-                else:
-                    tree[0] = OPERATOR_RESULTS_OPERATORS[idx]
-                    tree[1][0] = [NORMAL, variables[0]]
-                    tree[1][1] = [NORMAL, variables[1]]
-                return tree
+def generate_truth_masks(variables):
+    """ Generates the variable columns of a truth table as integers
+
+    Bit i of every integer holds the value the variable has in row i which is the same pattern
+    generate_truth_values produces. The first variable switches the least often.
+
+    :param variables: List of variables to use.
+    :return: A list containing one integer for every variable.
+    """
+    variable_count = len(variables)
+    column_length = 1 << variable_count
+    masks = []
+    for i in range(variable_count - 1, -1, -1):
+        switch_at = 1 << i
+        # one period consists of switch_at false rows followed by switch_at true rows
+        mask = ((1 << switch_at) - 1) << switch_at
+        period = switch_at << 1
+        while period < column_length:
+            mask |= mask << period
+            period <<= 1
+        masks.append(mask)
+    return masks
+
+
+def evaluate_columns(tree, columns, full, empty, keep=True):
+    """ Evaluates every node of a method tree once using bitwise operations on whole columns
+
+    Works with any column type supporting &, | and ^ like integers or numpy arrays.
+
+    :param tree: The tree to evaluate.
+    :param columns: A dictionary mapping every variable to its column.
+    :param full: A column in which every row is true.
+    :param empty: A column in which every row is false.
+    :param keep: If the columns of all nodes should be kept, otherwise a column is dropped once all its parents were
+        evaluated so only the column of the root remains.
+    :return: A dictionary mapping the id of every node to its column.
+    """
+    results = {}
+    nodes = get_nodes(tree)
+    if not keep:
+        remaining = {}
+        for node in nodes:
+            for child in get_children(node):
+                remaining[id(child)] = remaining.get(id(child), 0) + 1
+    for node in nodes:
+        operator = node[0]
+        if operator == NORMAL:
+            res = columns[node[1]]
+        elif operator == TRUE:
+            res = full
+        elif operator == FALSE:
+            res = empty
+        elif operator == NOT:
+            res = full ^ results[id(node[1])]
+        else:
+            res = apply_bitwise_operator(operator, results[id(node[1][0])], results[id(node[1][1])], full)
+        results[id(node)] = res
+        if not keep:
+            for child in get_children(node):
+                remaining[id(child)] -= 1
+                if not remaining[id(child)]:
+                    del results[id(child)]
+    return results
+
+
+def apply_bitwise_operator(operator, res1, res2, full):
+    """ Applies a gate taking two operands to two whole columns
+
+    :param operator: The gate to apply.
+    :param res1: The column of the first operand.
+    :param res2: The column of the second operand.
+    :param full: A column in which every row is true.
+    :return: The resulting column.
+    """
+    if operator == AND:
+        return res1 & res2
+    elif operator == NAND:
+        return full ^ (res1 & res2)
+    elif operator == OR:
+        return res1 | res2
+    elif operator == NOR:
+        return full ^ (res1 | res2)
+    elif operator in (XOR, UNEQUAL):
+        return res1 ^ res2
+    elif operator == IF:
+        return (full ^ res1) | res2
+    elif operator == EQUAL:
+        return full ^ res1 ^ res2
+    raise Exception("reached end of operator checker without conclusion")
 
-    elif True not in tree_result:
-        return [FALSE]
 
-    elif False not in tree_result:
-        return [TRUE]
+def evaluate_method_tree_bitwise(tree, variables, keep=True):
+    """ Evaluates every node of a method tree once for all rows at the same time
 
-    else:
-        # try match the result with any variable
-        for variable_table in table[:-1]:
-            if variable_table[1:] == tree_result:
-                tree = [NORMAL, variable_table[0]]
+    Every column is represented by an integer as returned by generate_truth_masks so a gate only has to apply one
+    bitwise operation to get its results for the whole table.
 
-    return tree
+    :param tree: The tree to evaluate.
+    :param variables: The variables present in the statement.
+    :param keep: If the columns of all nodes should be returned instead of only the one of the root.
+    :return: A dictionary mapping the id of every node to its column.
+    """
+    columns = dict(zip(variables, generate_truth_masks(variables)))
+    full = (1 << (1 << len(variables))) - 1
+    return evaluate_columns(tree, columns, full, 0, keep)
 
 
-def transform_into_normal_forms(tree):
-    operator = tree[0]
-    # the "=! NOT" exist to prevent creating double negations
-    if operator == IF:
-        # a if b -> -a or b
-        tree[0] = OR
-        a = transform_into_normal_forms(tree[1][0])
-        b = transform_into_normal_forms(tree[1][1])
-        if a[0] != NOT:
-            tree[1][0] = [NOT, a]
+def get_intermediate_template(tree, results):
+    """ Creates a format string which produces the intermediate string the gate functions return
+
+    :param tree: The tree to create the template for.
+    :param results: The columns of all nodes as returned by evaluate_method_tree_bitwise.
+    :return: The format string and a list of the columns which have to be filled in in order.
+    """
+    pieces = []
+    slots = []
+    # the stack holds nodes, literal strings and tuples marking where the result of a gate has to be inserted
+    stack = [tree]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            pieces.append(item)
+        elif isinstance(item, tuple):
+            pieces.append(" %s ")
+            slots.append(item[0])
+        elif item[0] == NORMAL:
+            pieces.append("%s")
+            slots.append(results[id(item)])
+        elif item[0] == TRUE:
+            pieces.append(TRUE_SIGN)
+        elif item[0] == FALSE:
+            pieces.append(FALSE_SIGN)
+        elif item[0] == NOT:
+            pieces.append(" %s")
+            slots.append(results[id(item)])
         else:
-            tree[1][0] = a[1]
+            stack.extend((" ", item[1][1], (results[id(item)],), item[1][0], " "))
+    return "".join(pieces), slots
 
-        tree[1][1] = b
 
+def get_operator_expression(operator, res1, res2):
+    """ Returns the python expression applying a gate taking two operands
+
+    :param operator: The gate to apply.
+    :param res1: The expression of the first operand.
+    :param res2: The expression of the second operand.
+    :return: The expression.
+    """
+    if operator == AND:
+        return f"{res1} and {res2}"
+    elif operator == NAND:
+        return f"not ({res1} and {res2})"
+    elif operator == OR:
+        return f"{res1} or {res2}"
+    elif operator == NOR:
+        return f"not ({res1} or {res2})"
+    elif operator in (XOR, UNEQUAL):
+        return f"{res1} != {res2}"
+    elif operator == IF:
+        return f"not {res1} or {res2}"
     elif operator == EQUAL:
-        # a equals b -> (a and b) or (-a and -b) -> (a and b) or -(a or b)
-        tree[0] = OR
-        a = transform_into_normal_forms(tree[1][0])
-        b = transform_into_normal_forms(tree[1][1])
-        tree[1][0] = [AND, [a, b]]
-        tree[1][1] = [NOT, [OR, [a, b]]]
-
-    elif operator == UNEQUAL:
-        # a unequals b -> -(a and b) and -(-a and -b) -> -(a and b) and (a or b)
-        tree[0] = AND
-        a = transform_into_normal_forms(tree[1][0])
-        b = transform_into_normal_forms(tree[1][1])
-        tree[1][1] = [NOT, [AND, [a, b]]]
-        tree[1][0] = [OR, [a, b]]
-
-    elif operator == XOR:
-        # a xor b -> (-a and b) or (a and -b)
-        tree[0] = OR
-        a = transform_into_normal_forms(tree[1][0])
-        b = transform_into_normal_forms(tree[1][1])
-        if a[0] != NOT:
-            tree[1][1] = [AND, [[NOT, a], b]]
+        return f"{res1} == {res2}"
+    raise Exception("reached end of operator checker without conclusion")
+
+
+def generate_tree_source(tree, variables, intermediate=True):
+    """ Generates the source of a function evaluating a method tree for one row
+
+    Every node is assigned to its own local variable in the order the nodes have to be evaluated so the resulting
+    function neither recurses nor calls any gate functions. The values of the variables are passed as positional
+    arguments in the order of variables.
+
+    :param tree: The tree to generate the source for.
+    :param variables: The variables present in the statement.
+    :param intermediate: If the function should also return the intermediate string the gate functions return.
+    :return: The source of a function called evaluate.
+    """
+    arguments = {variable: f"v{idx}" for idx, variable in enumerate(variables)}
+    names = {}
+    lines = [f"def evaluate({', '.join(arguments.values())}):"]
+    for node in get_nodes(tree):
+        name = f"n{len(names)}"
+        names[id(node)] = name
+        operator = node[0]
+        if operator == NORMAL:
+            expression = arguments[node[1]]
+        elif operator == TRUE:
+            expression = "True"
+        elif operator == FALSE:
+            expression = "False"
+        elif operator == NOT:
+            expression = f"not {names[id(node[1])]}"
         else:
-            tree[1][1] = [AND, [a, b]]
+            expression = get_operator_expression(operator, names[id(node[1][0])], names[id(node[1][1])])
+        lines.append(f"    {name} = {expression}")
+
+    result = names[id(tree)]
+    if intermediate:
+        template, slots = get_intermediate_template(tree, names)
+        if slots:
+            signs = ", ".join(f"{TRUE_SIGN!r} if {slot} else {FALSE_SIGN!r}" for slot in slots)
+            lines.append(f"    return {result}, {template!r} % ({signs},)")
+        else:
+            lines.append(f"    return {result}, {template!r}")
+    else:
+        lines.append(f"    return {result}")
+    return "\n".join(lines) + "\n"
+
+
+class LRUCache:
+    """ A dictionary which removes the least recently used entry once it is full
+
+    Every access holds a lock so a cache can be shared by solves running in multiple threads.
+
+    :param size: The maximum number of entries.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
 
-        if b[0] != NOT:
-            tree[1][0] = [AND, [a, [NOT, b]]]
+    def get(self, key, default=None):
+        """ Returns the value of a key marking it as the most recently used or default if it is not stored
+
+        :param key: The key to look up.
+        :param default: The value to return if the key is not stored.
+        :return: The value.
+        """
+        with self.lock:
+            if key not in self.entries:
+                return default
+            # dictionaries keep their insertion order so inserting the entry again moves it to the end
+            value = self.entries[key] = self.entries.pop(key)
+            return value
+
+    def put(self, key, value):
+        """ Stores a value removing the least recently used entry if the cache is full
+
+        :param key: The key to store the value under.
+        :param value: The value.
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+            if len(self.entries) >= self.size:
+                del self.entries[next(iter(self.entries))]
+            self.entries[key] = value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+COMPILED_TREES_SIZE = 128
+COMPILED_TREES = LRUCache(COMPILED_TREES_SIZE)
+
+
+def compile_method_tree(tree, variables, intermediate=True, metrics=None, cache=None):
+    """ Compiles a method tree into a function evaluating it for one row
+
+    The returned function takes the values of the variables as positional arguments in the order of variables and
+    returns the result and the intermediate string like the gate functions do, or only the result if intermediate is
+    False. Functions are cached by their source so structurally equal trees are only compiled once.
+
+    :param tree: The tree to compile.
+    :param variables: The variables present in the statement.
+    :param intermediate: If the function should also return the intermediate string.
+    :param metrics: The SolverMetrics to count cache hits and misses in, if any.
+    :param cache: The LRUCache to store the function in, defaults to COMPILED_TREES.
+    :return: The compiled function.
+    """
+    if cache is None:
+        cache = COMPILED_TREES
+    source = generate_tree_source(tree, variables, intermediate)
+    if metrics is not None:
+        metrics.add("compile_cache_hits" if source in cache else "compile_cache_misses")
+    return compile_source(source, "evaluate", cache)
+
+
+def compile_source(source, name, cache=None):
+    """ Compiles the source of a function and caches it by its source
+
+    :param source: The source defining the function.
+    :param name: The name of the function.
+    :param cache: The LRUCache to store the function in, defaults to COMPILED_TREES.
+    :return: The compiled function.
+    """
+    if cache is None:
+        cache = COMPILED_TREES
+    function = cache.get(source)
+    if function is None:
+        # two threads may compile the same source at once which only costs time as both functions are equal
+        namespace = {}
+        exec(compile(source, "<method tree>", "exec"), namespace)
+        function = namespace[name]
+        cache.put(source, function)
+    return function
+
+
+def generate_gray_sources(tree, variables):
+    """ Generates the sources of the functions iter_gray_rows uses to update the values of all nodes
+
+    The values are stored in a list in the order get_nodes returns the nodes. The first function sets them for the
+    row in which every variable is false. There is one more function for every variable which flips the variable and
+    updates only the nodes depending on it in the order they have to be evaluated.
+
+    :param tree: The tree to generate the sources for.
+    :param variables: The variables present in the statement.
+    :return: The nodes, the source of a function called initialize and the sources of functions called update for
+        every variable in the order of variables.
+    """
+    nodes = get_nodes(tree)
+    positions = {id(node): idx for idx, node in enumerate(nodes)}
+    parents = [[] for _ in nodes]
+    expressions = []
+    for idx, node in enumerate(nodes):
+        operator = node[0]
+        for child in get_children(node):
+            parents[positions[id(child)]].append(idx)
+        if operator in (NORMAL, FALSE):
+            expression = "False"
+        elif operator == TRUE:
+            expression = "True"
+        elif operator == NOT:
+            expression = f"not v[{positions[id(node[1])]}]"
         else:
-            tree[1][0] = [AND, [a, b]]
+            expression = get_operator_expression(
+                operator, f"v[{positions[id(node[1][0])]}]", f"v[{positions[id(node[1][1])]}]"
+            )
+        expressions.append(f"    v[{idx}] = {expression}")
+
+    initialize = "def initialize(v):\n" + "\n".join(expressions) + "\n"
+    updates = []
+    for variable in variables:
+        flipped = [idx for idx, node in enumerate(nodes) if node[0] == NORMAL and node[1] == variable]
+        # every node depending on the variable is a parent of a node already depending on it
+        dirty = set()
+        stack = list(flipped)
+        while stack:
+            for parent in parents[stack.pop()]:
+                if parent not in dirty:
+                    dirty.add(parent)
+                    stack.append(parent)
+        lines = [f"    v[{idx}] = not v[{idx}]" for idx in flipped]
+        lines += [expressions[idx] for idx in sorted(dirty)]
+        updates.append("def update(v):\n" + ("\n".join(lines) if lines else "    pass") + "\n")
+    return nodes, initialize, updates
+
+
+def iter_gray_rows(tree, variables, cache=None):
+    """ Evaluates a method tree for all rows visiting them in gray code order
+
+    Exactly one variable changes from one row to the next so only the nodes depending on it are evaluated again.
+
+    :param tree: The tree to evaluate.
+    :param variables: The variables present in the statement.
+    :param cache: The LRUCache to store the compiled functions in, defaults to COMPILED_TREES.
+    :return: The nodes in the order of the values and a generator yielding the index of every row together with the
+        list of the values of all nodes. The list is changed in place for the next row.
+    """
+    nodes, initialize, updates = generate_gray_sources(tree, variables)
+    updates = [compile_source(source, "update", cache) for source in updates]
+    values = [False] * len(nodes)
+    compile_source(initialize, "initialize", cache)(values)
+
+    def iter_rows():
+        variable_count = len(variables)
+        row = 0
+        yield row, values
+        for step in range(1, 1 << variable_count):
+            # the lowest set bit of the step is the bit which changes in the gray code
+            bit = (step & -step).bit_length() - 1
+            updates[variable_count - bit - 1](values)
+            row ^= 1 << bit
+            yield row, values
+    return nodes, iter_rows()
+
+
+def run_method_tree_gray(tree, table, variables, intermediate=True, cache=None):
+    """ Fills an empty truth table like run_method_tree does but visits the rows in gray code order
 
-    elif operator == NAND:
-        # a nand b -> -(a and b)
-        if tree[0] != NOT:
-            tree[0] = NOT
-        tree[1] = [AND, transform_into_normal_forms(tree[1])]
+    :param tree: The tree to run.
+    :param table: The truth table to fill and use.
+    :param variables: The variables present in the statement.
+    :param intermediate: If the intermediate strings should be created, otherwise None is stored in their place.
+    :param cache: The LRUCache to store the compiled functions in, defaults to COMPILED_TREES.
+    :return: The filled out truth table.
+    """
+    nodes, rows = iter_gray_rows(tree, variables, cache)
+    root = len(nodes) - 1
+    result_table = table[len(variables)]
+    if not intermediate:
+        for row, values in rows:
+            result_table[row] = None, values[root]
+        return table
+
+    template, slots = get_intermediate_template(tree, {id(node): idx for idx, node in enumerate(nodes)})
+    signs = ", ".join(f"{TRUE_SIGN!r} if v[{slot}] else {FALSE_SIGN!r}" for slot in slots)
+    render = compile_source(
+        f"def render(v):\n    return {template!r} % ({signs}{',' if slots else ''})\n", "render", cache
+    )
+    for row, values in rows:
+        result_table[row] = render(values), values[root]
+    return table
 
-    elif operator == NOR:
-        # a nor b -> -(a or b)
-        if tree[0] != NOT:
-            tree[0] = NOT
-        tree[1] = [OR, transform_into_normal_forms(tree[1])]
 
-    elif operator == NORMAL:
-        return tree
+def evaluate_method_tree_gray(tree, variables, cache=None):
+    """ Evaluates a method tree like iter_gray_rows but only returns the result column
+
+    :param tree: The tree to evaluate.
+    :param variables: The variables present in the statement.
+    :param cache: The LRUCache to store the compiled functions in, defaults to COMPILED_TREES.
+    :return: The result column as an integer as returned by evaluate_method_tree_bitwise.
+    """
+    nodes, rows = iter_gray_rows(tree, variables, cache)
+    root = len(nodes) - 1
+    results = bytearray(max(1, (1 << len(variables)) >> 3))
+    for row, values in rows:
+        if values[root]:
+            results[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(results, "little")
 
-    elif operator == NOT:
-        tree[1] = transform_into_normal_forms(tree[1])
 
+def run_method_tree_bitwise(tree, table, variables, intermediate=True):
+    """ Fills an empty truth table like run_method_tree does but evaluates every gate only once for all rows
+
+    :param tree: The tree to run.
+    :param table: The truth table to fill and use.
+    :param variables: The variables present in the statement.
+    :param intermediate: If the intermediate strings should be created, otherwise None is stored in their place.
+    :return: The filled out truth table.
+    """
+    results = evaluate_method_tree_bitwise(tree, variables, keep=intermediate)
+    return fill_truth_table(tree, table, variables, results, intermediate)
+
+
+def fill_truth_table(tree, table, variables, results, intermediate=True):
+    """ Fills the result column of a truth table using the integer columns of all nodes
+
+    :param tree: The tree the columns belong to.
+    :param table: The truth table to fill.
+    :param variables: The variables present in the statement.
+    :param results: The columns of all nodes as returned by evaluate_method_tree_bitwise.
+    :param intermediate: If the intermediate strings should be created, otherwise None is stored in their place and
+        only the column of the root is needed.
+    :return: The filled out truth table.
+    """
+    column_length = 1 << len(variables)
+    if not intermediate:
+        result_column = format(results[id(tree)], f"0{column_length}b")[::-1]
+        table[len(variables)] = [(None, char == "1") for char in result_column]
+        return table
+    template, slots = get_intermediate_template(tree, results)
+
+    # converting every column into a string once avoids shifting the big integers for every single row
+    columns = [format(mask, f"0{column_length}b")[::-1] for mask in slots]
+    result_column = format(results[id(tree)], f"0{column_length}b")[::-1]
+    result_table = table[len(variables)]
+    if columns:
+        for step, chars in enumerate(zip(*columns)):
+            result_table[step] = template % chars, result_column[step] == "1"
     else:
-        tree[1][0] = transform_into_normal_forms(tree[1][0])
-        tree[1][1] = transform_into_normal_forms(tree[1][1])
-    return tree
+        for step in range(column_length):
+            result_table[step] = template, result_column[step] == "1"
+    return table
 
 
-def optimize_truth_table(tree):
-    tree = transform_into_normal_forms(tree)
-    tree = replace_with_same_resulting_operators(tree)
-    return tree
+# the packed byte of a variable switching every 1, 2 or 4 rows as bits are stored starting with the lowest one
+PACKED_PATTERNS = [
+    0b10101010,
+    0b11001100,
+    0b11110000
+]
 
 
-def reconstruct_from_tree(tree, first=True):
-    operator = tree[0]
-    if operator == NORMAL:
-        return tree[1]
+def generate_truth_values_numpy(variables):
+    """ Generates the variable columns of a truth table as packed numpy arrays
 
-    elif operator == NOT:
-        return NOT_SIGN + reconstruct_from_tree(tree[1], first=False)
+    Row i of a column is stored in bit i % 8 of byte i // 8 which is the layout of numpy.packbits with
+    bitorder="little" and of the integers returned by generate_truth_masks. Variables switching every 8 or more rows
+    consist of whole bytes being either 0 or 255 so they are built by broadcasting those two values.
 
-    elif operator in (TRUE, FALSE):
-        return globals()[f"{operator.__name__}_SIGN"]
+    :param variables: List of variables to use.
+    :return: A two dimensional uint8 array containing one packed column per variable.
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    variable_count = len(variables)
+    column_length = 1 << variable_count
+    byte_count = max(1, column_length >> 3)
+    columns = np.empty((variable_count, byte_count), dtype=np.uint8)
+    for column in range(variable_count):
+        i = variable_count - column - 1
+        if i < 3:
+            columns[column] = PACKED_PATTERNS[i]
+        else:
+            block = 1 << (i - 3)
+            pattern = np.array([0, 255], dtype=np.uint8).reshape(1, 2, 1)
+            columns[column] = np.broadcast_to(pattern, (byte_count // (block * 2), 2, block)).reshape(-1)
+    if column_length < 8:
+        # tables with less than 8 rows do not fill the only byte
+        columns &= (1 << column_length) - 1
+    return columns
 
-    else:
-        return f"{'(' if not first else ''}{reconstruct_from_tree(tree[1][0], first=False)} " \
-               f"{globals()[f'{operator.__name__}_SIGN']} " \
-               f"{reconstruct_from_tree(tree[1][1], first=False)}{')' if not first else ''}"
 
+def evaluate_method_tree_numpy(tree, variables, keep=True):
+    """ Evaluates every node of a method tree once using vectorized operations on packed numpy arrays
 
-def verbosity_print(string):
-    if VERBOSITY:
-        print(string)
+    Each column only takes one bit per row. Columns are viewed as uint64 if their size allows it to process 64 rows
+    at once. Bits past the last row of tables with less than 8 rows are undefined.
+
+    :param tree: The tree to evaluate.
+    :param variables: The variables present in the statement.
+    :param keep: If the columns of all nodes should be returned instead of only the one of the root.
+    :return: A dictionary mapping the id of every node to its packed uint8 column.
+    """
+    columns = generate_truth_values_numpy(variables)
+    byte_count = columns.shape[1]
+    if byte_count % 8 == 0:
+        columns = columns.view(np.uint64)
+    full = np.full(columns.shape[1], np.iinfo(columns.dtype).max, dtype=columns.dtype)
+    empty = np.zeros(columns.shape[1], dtype=columns.dtype)
+    results = evaluate_columns(tree, dict(zip(variables, columns)), full, empty, keep)
+    return {key: column.view(np.uint8) for key, column in results.items()}
 
 
-def create_truth_table(string, pre_process=True, optimize=True, verbosity=False):
-    """ Collection of functions which polish, check, optimize and parse the given string
+def run_method_tree_numpy(tree, table, variables, intermediate=True):
+    """ Fills an empty truth table like run_method_tree does but evaluates the tree on packed numpy arrays
 
-    :param pre_process: If the string should be pre processed.
-    :param optimize: If the tree should be optimized.
-    :param verbosity: If information should be printed to the console.
-    :param string: The string to process.
+    :param tree: The tree to run.
+    :param table: The truth table to fill and use.
+    :param variables: The variables present in the statement.
+    :param intermediate: If the intermediate strings should be created, otherwise None is stored in their place.
     :return: The filled out truth table.
     """
-    global VERBOSITY
-    VERBOSITY = verbosity
+    full = (1 << (1 << len(variables))) - 1
+    results = {
+        key: int.from_bytes(column.tobytes(), "little") & full
+        for key, column in evaluate_method_tree_numpy(tree, variables, intermediate).items()
+    }
+    return fill_truth_table(tree, table, variables, results, intermediate)
 
-    verbosity_print(f"Original Statement: {string}")
 
-    # -- prepare the statement --
-    if pre_process:
-        string = pre_process_statement(string)
-    verbosity_print(f"Pre-processed: {string}")
-    # TODO: wrap all statements in brackets as to prevent not using operator hierarchy
+def create_alias_table(replacing_dictionary):
+    """ Creates a lookup table for all aliases of a dictionary shaped like REPLACING_DICTIONARY
 
-    # -- check for syntax errors --
-    get_matching_brackets(string)
-    # TODO: check for rogue characters
+    :param replacing_dictionary: A dictionary mapping space separated aliases to the operator they stand for.
+    :return: A dictionary mapping the first character of every alias to a list of the aliases and their operators
+        sorted from the longest to the shortest alias.
+    """
+    alias_table = {}
+    for replace_string, operator in replacing_dictionary.items():
+        for alias in replace_string.lower().split():
+            alias_table.setdefault(alias[0], []).append((alias, operator))
+    for aliases in alias_table.values():
+        aliases.sort(key=lambda entry: len(entry[0]), reverse=True)
+    return alias_table
 
-    # -- create the method tree --
-    variables, method_tree = create_method_tree(string)
-    verbosity_print(f"Method Tree: {reconstruct_from_tree(method_tree)}")
 
-    # -- optimize the method tree --
-    if optimize:
-        method_tree = optimize_truth_table(method_tree)
-        verbosity_print(f"Optimized Statement: {reconstruct_from_tree(method_tree)}")
+ALIAS_TABLE = create_alias_table(REPLACING_DICTIONARY)
 
-    # -- parse the statement --
-    truth_table = generate_truth_values(variables)
-    completed_truth_table = run_method_tree(method_tree, truth_table, variables)
-    return completed_truth_table, method_tree
 
+def pre_process_statement(string, replacing_dictionary=None):
+    """ Removes whitespaces, replaces operators, removes double negations, etc.
 
-def boolean_to_string(value):
-    return "1" if value else "0"
+    Works in a single pass over the lowercased string. At every position the longest matching alias is replaced
+    with its operator, so "!=" becomes an unequal and not a negation followed by an equal. Negations cancel out
+    with a negation directly in front of them while scanning and negations at the end are removed. Every character
+    of the result is one token which create_method_tree consumes directly.
 
+    :param string: The string to process.
+    :param replacing_dictionary: A dictionary shaped like REPLACING_DICTIONARY which is used instead of it.
+    :return: The processed string.
+    """
+    if replacing_dictionary is None:
+        alias_table = ALIAS_TABLE
+    else:
+        alias_table = create_alias_table(replacing_dictionary)
 
-def get_representational_string(table, tree):
-    """ Returns a string which represents a given truth table
+    string = string.lower()
+    length = len(string)
+    tokens = []
+    idx = 0
+    while idx < length:
+        char = string[idx]
+        if char.isspace():
+            idx += 1
+            continue
+
+        token = char
+        step = 1
+        for alias, operator in alias_table.get(char, ()):
+            if string.startswith(alias, idx):
+                token = operator
+                step = len(alias)
+                break
 
-    :param table: The table to represent.
-    :param header: The header to use
-    :return: The generated string.
+        if token == NOT_SIGN and tokens and tokens[-1] == NOT_SIGN:
+            tokens.pop()
+        else:
+            tokens.append(token)
+        idx += step
+
+    while tokens and tokens[-1] == NOT_SIGN:
+        tokens.pop()
+    return "".join(tokens)
+
+
+def apply_de_morgan(tree):
+    """ Moves every negation down to the variables using De Morgan's laws
+
+    The tree is transformed into normal forms first so the result only consists of AND and OR with negations only
+    directly in front of variables. The given tree is not changed.
+
+    :param tree: The tree to transform.
+    :return: The transformed tree.
+    """
+    nodes = {}
+    tree = transform_into_normal_forms(tree)
+    # stores the tree and the negated tree with all negations moved down for every node
+    positive = {}
+    negative = {}
+    for node in get_nodes(tree):
+        operator = node[0]
+        if operator == NORMAL:
+            positive[id(node)] = intern_node(nodes, node)
+            negative[id(node)] = intern_node(nodes, [NOT, positive[id(node)]])
+        elif operator in (TRUE, FALSE):
+            positive[id(node)] = intern_node(nodes, node)
+            negative[id(node)] = intern_node(nodes, [FALSE] if operator == TRUE else [TRUE])
+        elif operator == NOT:
+            positive[id(node)] = negative[id(node[1])]
+            negative[id(node)] = positive[id(node[1])]
+        else:
+            first, second = node[1]
+            negated_operator = OR if operator == AND else AND
+            positive[id(node)] = intern_node(nodes, [operator, [positive[id(first)], positive[id(second)]]])
+            negative[id(node)] = intern_node(nodes, [negated_operator, [negative[id(first)], negative[id(second)]]])
+    return positive[id(tree)]
+
+
+def get_variables(tree):
+    """ Returns all variables used in a method tree
+
+    :param tree: The tree to search.
+    :return: A set of all variables.
+    """
+    return {node[1] for node in get_nodes(tree) if node[0] == NORMAL}
+
+
+def replace_with_same_resulting_operators(tree):
+    """ Replaces every sub tree with the simplest equivalent one that can be told by its results
+
+    The signature of every node is its column over all variables of the tree as evaluate_method_tree_bitwise
+    creates it and is computed once from the signatures of its children. Using the signature every node which always
+    has the same result is replaced by a constant, every node having the same results as a variable or its negation
+    by that variable and every node depending on two variables by the gate in OPERATOR_RESULTS it matches. Signatures
+    are dropped as soon as all parents of a node have been handled. The given tree is not changed.
+
+    :param tree: The tree to optimize.
+    :return: The optimized tree.
     """
+    tree_nodes = get_nodes(tree)
     variables = []
-    for i in range(len(table) - 1):
-        variables.append(table[i][0])
+    for node in tree_nodes:
+        if node[0] == NORMAL and node[1] not in variables:
+            variables.append(node[1])
     variable_count = len(variables)
+    full = (1 << (1 << variable_count)) - 1
+    masks = dict(zip(variables, generate_truth_masks(variables)))
+    variables_by_mask = {mask: variable for variable, mask in masks.items()}
+    positions = {variable: idx for idx, variable in enumerate(variables)}
+
+    # counts how many parents still need the signature of a node
+    remaining = {}
+    for node in tree_nodes:
+        for child in get_children(node):
+            remaining[id(child)] = remaining.get(id(child), 0) + 1
+
+    nodes = {}
+    signatures = {}
+    supports = {}
+    optimized = {}
+    for node in tree_nodes:
+        operator = node[0]
+        children = get_children(node)
+        if operator == NORMAL:
+            signature = masks[node[1]]
+            support = frozenset(node[1:])
+        elif operator == TRUE:
+            signature = full
+            support = frozenset()
+        elif operator == FALSE:
+            signature = 0
+            support = frozenset()
+        elif operator == NOT:
+            signature = full ^ signatures[id(node[1])]
+            support = supports[id(node[1])]
+        else:
+            signature = apply_bitwise_operator(operator, signatures[id(node[1][0])], signatures[id(node[1][1])], full)
+            support = supports[id(node[1][0])] | supports[id(node[1][1])]
+        signatures[id(node)] = signature
+        supports[id(node)] = support
+        for child in children:
+            remaining[id(child)] -= 1
+            if not remaining[id(child)]:
+                del signatures[id(child)]
+
+        if signature == 0:
+            res = [FALSE]
+        elif signature == full:
+            res = [TRUE]
+        elif signature in variables_by_mask:
+            res = [NORMAL, variables_by_mask[signature]]
+        elif full ^ signature in variables_by_mask:
+            res = negate(intern_node(nodes, [NORMAL, variables_by_mask[full ^ signature]]), nodes)
+        else:
+            res = None
+            if len(support) == 2:
+                first, second = sorted(support, key=positions.get)
+                first_shift = variable_count - positions[first] - 1
+                second_shift = variable_count - positions[second] - 1
+                # the rows in which only these two variables are set tell the results for every combination
+                result = [
+                    signature >> ((i >> 1) << first_shift | (i & 1) << second_shift) & 1 for i in range(4)
+                ]
+                if result in OPERATOR_RESULTS:
+                    gate = OPERATOR_RESULTS_OPERATORS[OPERATOR_RESULTS.index(result)]
+                    res = [gate, [intern_node(nodes, [NORMAL, first]), intern_node(nodes, [NORMAL, second])]]
+            if res is None:
+                if operator == NOT:
+                    res = negate(optimized[id(node[1])], nodes)
+                else:
+                    res = [operator, [optimized[id(node[1][0])], optimized[id(node[1][1])]]]
+        optimized[id(node)] = intern_node(nodes, res)
+    return optimized[id(tree)]
 
-    to_print = "|"
-    for i in range(variable_count):
-        to_print += f"  {variables[i]}  {' ' if i >= variable_count - 1 else ''}|"
-    recon = reconstruct_from_tree(tree)
-    to_print += f" {recon} |  #  |"
-    total_print = f"{to_print}\n{len(to_print) * '-'}\n"
 
-    for i in range(int(math.pow(2, variable_count))):
-        to_print = ""
-        for j in range(variable_count):
-            to_print += f"   {boolean_to_string(table[j][i + 1])}  {' ' if j >= variable_count - 1 else ''}"
-        inter = table[variable_count][i][0]
-        to_print += f"|{inter}|  {boolean_to_string(table[variable_count][i][1])}  |"
-        total_print += to_print + "\n"
-    return total_print
+def transform_into_normal_forms(tree):
+    """ Replaces every operator other than AND, OR and NOT with an equivalent statement only using those three
 
+    Works on the interned graph of the tree from the bottom up so every sub tree is only transformed once and
+    operands used multiple times by the replacement are shared instead of copied. The given tree is not changed.
 
-def solve(string, optimize=True):
-    """ A function which first creates a truth table and then prints it it also handles all custom exceptions raised
+    :param tree: The tree to transform.
+    :return: The transformed tree.
+    """
+    nodes = {}
+    transformed = {}
+    tree = intern_method_tree(tree, nodes)
+    for node in get_nodes(tree):
+        operator = node[0]
+        if operator in (NORMAL, TRUE, FALSE):
+            transformed[id(node)] = node
+            continue
+        elif operator == NOT:
+            transformed[id(node)] = negate(transformed[id(node[1])], nodes)
+            continue
+
+        a = transformed[id(node[1][0])]
+        b = transformed[id(node[1][1])]
+        if operator == IF:
+            # a if b -> -a or b
+            res = [OR, [negate(a, nodes), b]]
+
+        elif operator == EQUAL:
+            # a equals b -> (a and b) or (-a and -b) -> (a and b) or -(a or b)
+            res = [OR, [
+                intern_node(nodes, [AND, [a, b]]),
+                negate(intern_node(nodes, [OR, [a, b]]), nodes)
+            ]]
+
+        elif operator == UNEQUAL:
+            # a unequals b -> -(a and b) and -(-a and -b) -> -(a and b) and (a or b)
+            res = [AND, [
+                intern_node(nodes, [OR, [a, b]]),
+                negate(intern_node(nodes, [AND, [a, b]]), nodes)
+            ]]
+
+        elif operator == XOR:
+            # a xor b -> (-a and b) or (a and -b)
+            res = [OR, [
+                intern_node(nodes, [AND, [a, negate(b, nodes)]]),
+                intern_node(nodes, [AND, [negate(a, nodes), b]])
+            ]]
+
+        elif operator == NAND:
+            # a nand b -> -(a and b)
+            res = [NOT, intern_node(nodes, [AND, [a, b]])]
+
+        elif operator == NOR:
+            # a nor b -> -(a or b)
+            res = [NOT, intern_node(nodes, [OR, [a, b]])]
+
+        else:
+            res = [operator, [a, b]]
+        transformed[id(node)] = intern_node(nodes, res)
+    return transformed[id(tree)]
+
+
+# the optimizer keeps a column of all rows for every variable and node which takes up more memory than streaming the
+# rows of statements with more variables
+OPTIMIZE_MAX_VARIABLES = 20
+
+
+def optimize_truth_table(tree):
+    """ Replaces every sub tree which can be told by its results with a constant, a variable or a single gate
+
+    The tree is not transformed into normal forms first as that shares the operands of EQUAL, XOR and UNEQUAL which
+    grow exponentially once the statement is reconstructed, gates no rule applies to are kept as they are.
+
+    :param tree: The tree to optimize.
+    :return: The optimized tree.
+    """
+    return replace_with_same_resulting_operators(tree)
+
+
+try:
+    count_bits = int.bit_count
+except AttributeError:
+    def count_bits(value):
+        return bin(value).count("1")
+
+
+# up to this many variables all prime implicants are generated, above that they are found by expanding single rows
+EXACT_MINIMIZATION_LIMIT = 12
+
+
+def get_prime_implicants(result, variables):
+    """ Finds all prime implicants of a result column using the Quine-McCluskey method
+
+    A cube is stored as the row index of its first row and a mask of the row index bits it does not depend on. All
+    cubes sharing a mask are stored together as a single integer in which bit i is set if the cube starting in row i
+    is an implicant. Two cubes can be merged over bit b if the one starting in row i and the one in row i + 2 ** b
+    both exist which is checked for all of them at once by shifting and and-ing the integers.
+
+    :param result: The result column as an integer like evaluate_method_tree_bitwise returns it.
+    :param variables: The variables present in the statement.
+    :return: A list of all prime implicants as tuples of the first row and the mask.
+    """
+    variable_count = len(variables)
+    # cleared[b] has every bit set whose row index has bit b cleared
+    full = (1 << (1 << variable_count)) - 1
+    cleared = [full ^ mask for mask in reversed(generate_truth_masks(variables))]
+
+    primes = []
+    current = {0: result} if result else {}
+    while current:
+        merged = {}
+        for mask, cubes in current.items():
+            covered = 0
+            for b in range(variable_count):
+                bit = 1 << b
+                if mask & bit:
+                    continue
+                combined = cubes & (cubes >> bit) & cleared[b]
+                if combined:
+                    merged[mask | bit] = merged.get(mask | bit, 0) | combined
+                    covered |= combined | (combined << bit)
+
+            remaining = cubes & ~covered
+            while remaining:
+                lowest = remaining & -remaining
+                primes.append((lowest.bit_length() - 1, mask))
+                remaining ^= lowest
+        current = merged
+    return primes
+
+
+def expand_implicants(result, variables):
+    """ Finds prime implicants covering all rows of a result column without generating all of them
+
+    Works like the expand step of Espresso. The first row which is not covered yet is expanded into a prime implicant
+    by repeatedly removing the variable whose removal covers the most uncovered rows while the cube only covers rows
+    of the result. This is repeated until every row is covered and every cube whose rows are covered by the others
+    is removed afterwards.
+
+    :param result: The result column as an integer like evaluate_method_tree_bitwise returns it.
+    :param variables: The variables present in the statement.
+    :return: A list of the chosen prime implicants as tuples of the first row and the mask.
+    """
+    variable_count = len(variables)
+    cubes = []
+    remaining = result
+    while remaining:
+        rows = remaining & -remaining
+        value = rows.bit_length() - 1
+        mask = 0
+        while True:
+            best = None
+            best_gain = -1
+            for b in range(variable_count):
+                bit = 1 << b
+                if mask & bit:
+                    continue
+                # the rows the cube gains when it no longer depends on bit b of the row index
+                added = rows >> bit if value & bit else rows << bit
+                if added & ~result:
+                    continue
+                gain = count_bits(added & remaining)
+                if gain > best_gain:
+                    best = bit
+                    best_gain = gain
+            if best is None:
+                break
+            rows |= rows >> best if value & best else rows << best
+            value &= ~best
+            mask |= best
+        cubes.append(((value, mask), rows))
+        remaining &= ~rows
+
+    # remove redundant cubes starting with the smallest ones
+    cubes.sort(key=lambda entry: count_bits(entry[0][1]))
+    # the rows covered by every cube from an index on so every cube is only combined with the others once
+    suffixes = [0] * (len(cubes) + 1)
+    for idx in range(len(cubes) - 1, -1, -1):
+        suffixes[idx] = suffixes[idx + 1] | cubes[idx][1]
+    chosen = []
+    chosen_rows = 0
+    for idx, (cube, rows) in enumerate(cubes):
+        if rows & ~(chosen_rows | suffixes[idx + 1]):
+            chosen.append(cube)
+            chosen_rows |= rows
+    return chosen
+
+
+def get_cube_rows(cube):
+    """ Returns an integer with the bits of all rows covered by a cube set
+
+    :param cube: The cube as a tuple of the first row and the mask.
+    :return: The rows covered by the cube.
+    """
+    value, mask = cube
+    rows = 1 << value
+    bit = 1
+    while bit <= mask:
+        if mask & bit:
+            rows |= rows << bit
+        bit <<= 1
+    return rows
+
+
+def select_prime_implicants(result, primes):
+    """ Selects a small set of prime implicants covering all rows of a result column
+
+    All essential prime implicants are chosen first, afterwards the prime implicant covering the most remaining rows
+    is picked until all rows are covered. Ties are broken by choosing the cube with less literals. The candidates are
+    kept in a heap ordered by the number of rows they covered when they were last looked at.
+
+    :param result: The result column as an integer.
+    :param primes: The prime implicants as returned by get_prime_implicants.
+    :return: A list of the chosen prime implicants.
+    """
+    rows = [get_cube_rows(prime) for prime in primes]
+    covered_once = 0
+    covered_twice = 0
+    for prime_rows in rows:
+        covered_twice |= covered_once & prime_rows
+        covered_once |= prime_rows
+    essential_rows = covered_once & ~covered_twice
+
+    chosen = []
+    remaining = result
+    candidates = []
+    for prime, prime_rows in zip(primes, rows):
+        if prime_rows & essential_rows:
+            chosen.append(prime)
+            remaining &= ~prime_rows
+        else:
+            candidates.append((prime, prime_rows))
+
+    # the number of remaining rows a cube covers can only shrink so scores are only updated when a cube comes up
+    heap = []
+    for idx, (prime, prime_rows) in enumerate(candidates):
+        score = count_bits(prime_rows & remaining)
+        if score:
+            heap.append((-score, -count_bits(prime[1]), idx))
+    heapq.heapify(heap)
+    while remaining:
+        _, literals, idx = heapq.heappop(heap)
+        prime, prime_rows = candidates[idx]
+        score = count_bits(prime_rows & remaining)
+        if not score:
+            continue
+        if heap and (-score, literals, idx) > heap[0]:
+            heapq.heappush(heap, (-score, literals, idx))
+            continue
+        chosen.append(prime)
+        remaining &= ~prime_rows
+    return chosen
+
+
+def create_cube_tree(cube, variables, nodes, negated=False):
+    """ Creates a method tree which is true for exactly the rows of a cube
+
+    :param cube: The cube as a tuple of the first row and the mask.
+    :param variables: The variables present in the statement.
+    :param nodes: The dictionary to intern all nodes in.
+    :param negated: If the negated cube should be created instead which is an OR of the negated variables.
+    :return: The created tree.
+    """
+    value, mask = cube
+    variable_count = len(variables)
+    operator = OR if negated else AND
+    tree = None
+    for idx in range(variable_count - 1, -1, -1):
+        bit = 1 << (variable_count - idx - 1)
+        if mask & bit:
+            continue
+        literal = intern_node(nodes, [NORMAL, variables[idx]])
+        if bool(value & bit) == negated:
+            literal = intern_node(nodes, [NOT, literal])
+        tree = literal if tree is None else intern_node(nodes, [operator, [literal, tree]])
+    if tree is None:
+        return intern_node(nodes, [FALSE] if negated else [TRUE])
+    return tree
+
+
+def join_trees(trees, operator, nodes, empty):
+    """ Joins trees using one operator grouping them from the right like create_method_tree does
+
+    :param trees: The trees to join.
+    :param operator: The operator used to join them.
+    :param nodes: The dictionary to intern all nodes in.
+    :param empty: The constant returned if there are no trees.
+    :return: The joined tree.
+    """
+    tree = None
+    for sub_tree in reversed(trees):
+        tree = sub_tree if tree is None else intern_node(nodes, [operator, [sub_tree, tree]])
+    if tree is None:
+        return intern_node(nodes, [empty])
+    return tree
+
+
+def get_implicant_cover(result, variables):
+    """ Returns a small set of prime implicants covering all rows of a result column
+
+    Uses the exact Quine-McCluskey method for up to EXACT_MINIMIZATION_LIMIT variables and expand_implicants for
+    more.
+
+    :param result: The result column as an integer.
+    :param variables: The variables present in the statement.
+    :return: A list of prime implicants as tuples of the first row and the mask.
+    """
+    if len(variables) <= EXACT_MINIMIZATION_LIMIT:
+        return select_prime_implicants(result, get_prime_implicants(result, variables))
+    return expand_implicants(result, variables)
+
+
+def create_minimal_dnf(result, variables):
+    """ Creates a minimal or close to minimal disjunctive normal form having the given results
+
+    :param result: The result column as an integer like evaluate_method_tree_bitwise returns it.
+    :param variables: The variables present in the statement.
+    :return: The method tree of the normal form.
+    """
+    nodes = {}
+    cubes = get_implicant_cover(result, variables)
+    return join_trees([create_cube_tree(cube, variables, nodes) for cube in cubes], OR, nodes, FALSE)
+
+
+def create_minimal_cnf(result, variables):
+    """ Creates a minimal or close to minimal conjunctive normal form having the given results
+
+    Works by minimizing the negated results and negating the disjunctive normal form using De Morgan's laws.
+
+    :param result: The result column as an integer like evaluate_method_tree_bitwise returns it.
+    :param variables: The variables present in the statement.
+    :return: The method tree of the normal form.
+    """
+    nodes = {}
+    negated_result = ((1 << (1 << len(variables))) - 1) ^ result
+    cubes = get_implicant_cover(negated_result, variables)
+    return join_trees([create_cube_tree(cube, variables, nodes, negated=True) for cube in cubes], AND, nodes, TRUE)
+
+
+def minimize_method_tree(tree, variables):
+    """ Creates the minimal disjunctive and conjunctive normal form of a method tree
+
+    :param tree: The tree to minimize.
+    :param variables: The variables present in the statement.
+    :return: The method trees of the disjunctive and the conjunctive normal form.
+    """
+    result = evaluate_method_tree_bitwise(tree, variables, keep=False)[id(tree)]
+    return create_minimal_dnf(result, variables), create_minimal_cnf(result, variables)
+
+
+BDD_CACHE_SIZE = 1 << 18
+
+
+class BDD:
+    """ A reduced ordered binary decision diagram able to handle statements with too many variables to enumerate
+
+    Nodes are referenced by integers, 0 and 1 being the false and true terminal. Every other node tests the variable
+    on its level and continues with its low child if it is false and its high child if it is true. The unique table
+    guarantees there are never two nodes testing the same variable with the same children so two statements are
+    equivalent exactly if they are the same node. All operations are built on ite whose results are stored in a
+    computed cache which is cleared once it holds cache_size entries.
+    """
+
+    def __init__(self, order, cache_size=BDD_CACHE_SIZE, max_nodes=None):
+        """
+        :param order: The variables in the order they are tested in, the first one is tested first.
+        :param cache_size: The maximum number of entries in the computed cache.
+        :param max_nodes: The number of nodes after which a NodeLimitException is raised, unlimited if None.
+        """
+        self.order = list(order)
+        self.positions = {variable: idx for idx, variable in enumerate(self.order)}
+        self.cache_size = cache_size
+        self.max_nodes = max_nodes
+        terminal_level = len(self.order)
+        self.levels = [terminal_level, terminal_level]
+        self.lows = [0, 1]
+        self.highs = [0, 1]
+        self.unique = {}
+        self.cache = {}
+
+    def make_node(self, level, low, high):
+        """ Returns the node testing the variable on level with the given children creating it if necessary """
+        if low == high:
+            return low
+        key = level, low, high
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.levels)
+            if self.max_nodes is not None and node >= self.max_nodes:
+                raise NodeLimitException("")
+            self.levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.unique[key] = node
+        return node
+
+    def variable(self, name):
+        """ Returns the node which is true exactly if the variable is true """
+        return self.make_node(self.positions[name], 0, 1)
+
+    def cofactors(self, node, level):
+        """ Returns the children of a node for the variable on level or the node itself if it does not test it """
+        if self.levels[node] == level:
+            return self.lows[node], self.highs[node]
+        return node, node
+
+    def ite(self, f, g, h):
+        """ Returns the node of "if f then g else h"
+
+        Works on an explicit stack instead of recursing once per level so diagrams of any depth can be built. A call
+        whose result is not known right away is split into the calls of its cofactors and a task creating its node
+        once both results are there.
+        """
+        results = []
+        # tasks are either the operands of a call or the key and the level of a node waiting for its children
+        tasks = [(f, g, h)]
+        while tasks:
+            task = tasks.pop()
+            if len(task) == 2:
+                key, level = task
+                high = results.pop()
+                low = results.pop()
+                node = self.make_node(level, low, high)
+                if len(self.cache) >= self.cache_size:
+                    # removing the oldest entry one by one gets slower the more were removed before as the
+                    # dictionary has to skip them, the cache only saves work so it can simply start over
+                    self.cache.clear()
+                self.cache[key] = node
+                results.append(node)
+                continue
+
+            f, g, h = task
+            if f == 1:
+                node = g
+            elif f == 0 or g == h:
+                node = h
+            elif g == 1 and h == 0:
+                node = f
+            else:
+                node = self.cache.get(task)
+            if node is not None:
+                results.append(node)
+                continue
+
+            level = min(self.levels[f], self.levels[g], self.levels[h])
+            f_low, f_high = self.cofactors(f, level)
+            g_low, g_high = self.cofactors(g, level)
+            h_low, h_high = self.cofactors(h, level)
+            # the low call is on top so its result is below the one of the high call
+            tasks.append((task, level))
+            tasks.append((f_high, g_high, h_high))
+            tasks.append((f_low, g_low, h_low))
+        return results[0]
+
+    def negate(self, f):
+        return self.ite(f, 0, 1)
+
+    def apply(self, operator, f, g):
+        """ Applies a gate taking two operands to two nodes
+
+        :param operator: The gate to apply.
+        :param f: The node of the first operand.
+        :param g: The node of the second operand.
+        :return: The resulting node.
+        """
+        if operator == AND:
+            return self.ite(f, g, 0)
+        elif operator == NAND:
+            return self.ite(f, self.negate(g), 1)
+        elif operator == OR:
+            return self.ite(f, 1, g)
+        elif operator == NOR:
+            return self.ite(f, 0, self.negate(g))
+        elif operator in (XOR, UNEQUAL):
+            return self.ite(f, self.negate(g), g)
+        elif operator == IF:
+            return self.ite(f, g, 1)
+        elif operator == EQUAL:
+            return self.ite(f, g, self.negate(g))
+        raise Exception("reached end of operator checker without conclusion")
+
+    def add_method_tree(self, tree, cancel=None):
+        """ Builds the node of a method tree from the bottom up
+
+        :param tree: The tree to build, all its variables have to be part of the order.
+        :param cancel: A threading.Event which stops building by raising a CancelledException once it is set.
+        :return: The node of the tree.
+        """
+        results = {}
+        for node in get_nodes(tree):
+            if cancel is not None and cancel.is_set():
+                raise CancelledException("")
+            operator = node[0]
+            if operator == NORMAL:
+                res = self.variable(node[1])
+            elif operator == TRUE:
+                res = 1
+            elif operator == FALSE:
+                res = 0
+            elif operator == NOT:
+                res = self.negate(results[id(node[1])])
+            else:
+                res = self.apply(operator, results[id(node[1][0])], results[id(node[1][1])])
+            results[id(node)] = res
+        return results[id(tree)]
+
+    def is_tautology(self, f):
+        return f == 1
+
+    def is_contradiction(self, f):
+        return f == 0
+
+    def is_equivalent(self, f, g):
+        return f == g
+
+    def count_satisfying(self, f):
+        """ Counts the assignments of all variables in the order for which a node is true
+
+        :param f: The node to count the assignments of.
+        :return: The number of assignments.
+        """
+        # counts[node] is the number of assignments of the variables from the level of the node onwards
+        counts = {0: 0, 1: 1}
+        stack = [f]
+        while stack:
+            node = stack[-1]
+            if node in counts:
+                stack.pop()
+                continue
+            low = self.lows[node]
+            high = self.highs[node]
+            if low not in counts:
+                stack.append(low)
+            elif high not in counts:
+                stack.append(high)
+            else:
+                stack.pop()
+                level = self.levels[node]
+                counts[node] = (
+                    counts[low] << (self.levels[low] - level - 1)
+                ) + (
+                    counts[high] << (self.levels[high] - level - 1)
+                )
+        return counts[f] << self.levels[f]
+
+    def find_satisfying(self, f):
+        """ Returns an assignment of all variables in the order for which a node is true or None if there is none """
+        if f == 0:
+            return None
+        assignment = dict.fromkeys(self.order, False)
+        while f != 1:
+            variable = self.order[self.levels[f]]
+            if self.highs[f] != 0:
+                assignment[variable] = True
+                f = self.highs[f]
+            else:
+                f = self.lows[f]
+        return assignment
+
+    def evaluate(self, f, values):
+        """ Returns the result of a node for the given values of the variables
+
+        :param f: The node to evaluate.
+        :param values: A dictionary mapping every variable to its value.
+        :return: The result.
+        """
+        while f > 1:
+            f = self.highs[f] if values[self.order[self.levels[f]]] else self.lows[f]
+        return f == 1
+
+    def iter_rows(self, f, variables=None):
+        """ Lazily generates the rows of the truth table of a node
+
+        :param f: The node to generate the rows of.
+        :param variables: The variables of the table in the order of its columns, the order of the diagram if None.
+        :return: A generator yielding the values of the variables and the result of every row in the same order as
+            the rows of a truth table.
+        """
+        if variables is None:
+            variables = self.order
+        for values in itertools.product((False, True), repeat=len(variables)):
+            yield values, self.evaluate(f, dict(zip(variables, values)))
+
+
+def create_bdd(tree, variables, order=None, cache_size=BDD_CACHE_SIZE, max_nodes=None, cancel=None):
+    """ Creates a binary decision diagram of a method tree
+
+    :param tree: The tree to create the diagram of.
+    :param variables: The variables present in the statement.
+    :param order: The order the variables are tested in, the order of variables if None.
+    :param cache_size: The maximum number of entries in the computed cache.
+    :param max_nodes: The number of nodes after which a NodeLimitException is raised, unlimited if None.
+    :param cancel: A threading.Event which stops building by raising a CancelledException once it is set.
+    :return: The diagram and the node of the tree.
+    """
+    bdd = BDD(variables if order is None else order, cache_size, max_nodes)
+    return bdd, bdd.add_method_tree(tree, cancel)
+
+
+# "sat" checks if any row is true, "taut" if all rows are true and "count" counts the true rows
+CHECK_MODES = (
+    "sat",
+    "taut",
+    "count"
+)
+# statements with up to this many variables are checked by evaluating all rows at once which is faster than searching
+CHECK_TABLE_MAX_VARIABLES = 20
+# bigger diagrams are given up on and the rows are counted by splitting the statement instead
+CHECK_BDD_MAX_NODES = 1 << 20
+
+
+def condition_method_tree(tree, assignment, nodes):
+    """ Replaces assigned variables with constants and removes all constants afterwards
+
+    Expects a tree only consisting of AND, OR and negated variables as apply_de_morgan returns it which is interned
+    in nodes. The result is interned in nodes as well.
+
+    :param tree: The tree to condition.
+    :param assignment: A dictionary mapping variables to their value.
+    :param nodes: The dictionary storing all interned nodes.
+    :return: The conditioned tree.
+    """
+    true = intern_node(nodes, [TRUE])
+    false = intern_node(nodes, [FALSE])
+    results = {}
+    for node in get_nodes(tree):
+        operator = node[0]
+        if operator == NORMAL:
+            if node[1] in assignment:
+                res = true if assignment[node[1]] else false
+            else:
+                res = node
+        elif operator in (TRUE, FALSE):
+            res = node
+        elif operator == NOT:
+            res = results[id(node[1])]
+            if res is true:
+                res = false
+            elif res is false:
+                res = true
+            else:
+                res = negate(res, nodes)
+        else:
+            a = results[id(node[1][0])]
+            b = results[id(node[1][1])]
+            # the constant which decides the result on its own and the one which can be left out
+            absorbing, neutral = (false, true) if operator == AND else (true, false)
+            if a is absorbing or b is absorbing:
+                res = absorbing
+            elif a is neutral or a is b:
+                res = b
+            elif b is neutral:
+                res = a
+            else:
+                res = intern_node(nodes, [operator, [a, b]])
+        results[id(node)] = res
+    return results[id(tree)]
+
+
+def get_conjuncts(tree):
+    """ Returns all sub trees combined by the AND operators at the top of a tree """
+    conjuncts = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node[0] == AND:
+            stack.extend(reversed(node[1]))
+        else:
+            conjuncts.append(node)
+    return conjuncts
+
+
+def get_first_variable(tree):
+    for node in get_nodes(tree):
+        if node[0] == NORMAL:
+            return node[1]
+    return None
+
+
+def count_models(tree, nodes, counts, supports, cancel=None):
+    """ Counts the assignments of the variables of a tree which make it true
+
+    Splits the tree on a variable and counts both halves which are cached as many splits lead to the same tree.
+    Trees which are an AND of parts not sharing any variables are split into these parts whose counts are multiplied.
+    Works on an explicit stack so trees needing any number of splits can be counted.
+
+    :param tree: The tree to count as returned by apply_de_morgan and interned in nodes.
+    :param nodes: The dictionary storing all interned nodes.
+    :param counts: The dictionary caching the count of every tree by its id.
+    :param supports: The dictionary caching the variables of every tree by its id.
+    :param cancel: A threading.Event which stops counting by raising a CancelledException once it is set.
+    :return: The number of assignments of the variables of the tree which make it true.
+    """
+    def get_count(part):
+        if part[0] in (TRUE, FALSE):
+            return 1 if part[0] == TRUE else 0
+        return counts.get(id(part))
+
+    # the parts of every tree on the stack, if they are multiplied and how far the count of every part is shifted
+    plans = {}
+    stack = [tree]
+    while stack:
+        current = stack[-1]
+        if get_count(current) is not None:
+            stack.pop()
+            continue
+        plan = plans.get(id(current))
+        if plan is None:
+            if cancel is not None and cancel.is_set():
+                raise CancelledException("")
+            plan = plans[id(current)] = plan_model_count(current, nodes, supports)
+            missing = [part for part, _ in plan[1] if get_count(part) is None]
+            if missing:
+                stack.extend(missing)
+                continue
+
+        multiply, parts = plan
+        if multiply:
+            count = 1
+            for part, _ in parts:
+                count *= get_count(part)
+        else:
+            count = sum(get_count(part) << free for part, free in parts)
+        counts[id(current)] = count
+        del plans[id(current)]
+        stack.pop()
+    return get_count(tree)
+
+
+def plan_model_count(tree, nodes, supports):
+    """ Splits a tree as count_models counts it
+
+    :param tree: The tree to split which is not a constant.
+    :param nodes: The dictionary storing all interned nodes.
+    :param supports: The dictionary caching the variables of every tree by its id.
+    :return: If the counts of the parts are multiplied instead of added and a list of every part together with the
+        number of bits its count is shifted by.
+    """
+    conjuncts = get_conjuncts(tree)
+    components = []
+    if len(conjuncts) > 1:
+        # merge conjuncts sharing variables into components
+        for conjunct in conjuncts:
+            support = get_support(conjunct, supports)
+            component = [[conjunct], support]
+            for other in components[:]:
+                if other[1] & support:
+                    component[0] += other[0]
+                    component[1] = component[1] | other[1]
+                    components.remove(other)
+            components.append(component)
+    if len(components) > 1:
+        return True, [(join_trees(component, AND, nodes, TRUE), 0) for component, _ in components]
+
+    variable = get_first_variable(tree)
+    if variable is None:
+        # a tree without variables only consists of constants which conditioning folds into one
+        return False, [(condition_method_tree(tree, {}, nodes), 0)]
+    support_count = len(get_support(tree, supports))
+    parts = []
+    for value in (False, True):
+        half = condition_method_tree(tree, {variable: value}, nodes)
+        # variables which disappeared from the half can have any value
+        parts.append((half, support_count - 1 - len(get_support(half, supports))))
+    return False, parts
+
+
+def get_support(tree, supports):
+    if id(tree) not in supports:
+        supports[id(tree)] = frozenset(get_variables(tree))
+    return supports[id(tree)]
+
+
+def check(string, mode="sat", pre_process=True, cancel=None):
+    """ Answers a question about a statement without creating its truth table
+
+    Statements with up to CHECK_TABLE_MAX_VARIABLES variables are evaluated for all rows at once. Bigger ones are
+    checked by searching their Tseitin conjunctive normal form for "sat" and "taut" and counted using a binary decision
+    diagram, or count_models should the diagram need more than CHECK_BDD_MAX_NODES nodes.
+
+    :param string: The statement to check.
+    :param mode: One of CHECK_MODES.
+    :param pre_process: If the string should be pre processed.
+    :param cancel: A threading.Event which stops the check by raising a CancelledException once it is set.
+    :return: If the statement is satisfiable for "sat", if it is a tautology for "taut" and the number of true rows
+        for "count".
+    """
+    if mode not in CHECK_MODES:
+        raise ValueError(f"unknown mode {mode!r}, expected one of {', '.join(CHECK_MODES)}")
+    if pre_process:
+        string = pre_process_statement(string)
+    variables, tree = create_method_tree(string)
+
+    try:
+        if len(variables) <= CHECK_TABLE_MAX_VARIABLES:
+            column = evaluate_method_tree_bitwise(tree, variables, keep=False)[id(tree)]
+            if mode == "sat":
+                return column != 0
+            elif mode == "taut":
+                return column == (1 << (1 << len(variables))) - 1
+            return count_bits(column)
+
+        if mode == "sat":
+            return find_satisfying_assignment(tree, variables, cancel) is not None
+        elif mode == "taut":
+            # a statement is a tautology if its negation can not be satisfied
+            return find_satisfying_assignment(negate(tree), variables, cancel) is None
+
+        try:
+            bdd, node = create_bdd(tree, variables, max_nodes=CHECK_BDD_MAX_NODES, cancel=cancel)
+            return bdd.count_satisfying(node)
+        except NodeLimitException:
+            pass
+        nodes = {}
+        # apply_de_morgan does not fold constants so parts without any variables are folded first
+        tree = condition_method_tree(intern_method_tree(apply_de_morgan(tree), nodes), {}, nodes)
+        supports = {}
+        count = count_models(tree, nodes, {}, supports, cancel)
+    except CancelledException:
+        raise CancelledException(string) from None
+    return count << (len(variables) - len(get_support(tree, supports)))
+
+
+def get_tseitin_clauses(operator, x, a, b):
+    """ Returns the clauses which make the literal x equal to a gate applied to the literals a and b
+
+    :param operator: The gate taking two operands.
+    :param x: The literal of the gate.
+    :param a: The literal of the first operand.
+    :param b: The literal of the second operand.
+    :return: A list of clauses which are lists of literals.
+    """
+    if operator in (AND, OR, NAND, NOR, IF):
+        # every one of these gates is an AND with some of its literals negated
+        if operator == OR:
+            x, a, b = -x, -a, -b
+        elif operator == NAND:
+            x = -x
+        elif operator == NOR:
+            a, b = -a, -b
+        elif operator == IF:
+            x, b = -x, -b
+        return [[-x, a], [-x, b], [x, -a, -b]]
+    elif operator in (XOR, UNEQUAL, EQUAL):
+        if operator == EQUAL:
+            x = -x
+        return [[-x, a, b], [-x, -a, -b], [x, -a, b], [x, a, -b]]
+    raise Exception("reached end of operator checker without conclusion")
+
+
+def create_tseitin_cnf(tree, variables):
+    """ Converts a method tree into a conjunctive normal form which is satisfiable exactly if the tree is
+
+    Every gate gets an auxiliary variable and a few clauses making it equal to the gate so the size of the result
+    grows linearly with the number of nodes. Negations do not need one as they negate the literal of their child.
+    Variables are numbered starting at 1 in the order of variables followed by the auxiliary variables.
+
+    :param tree: The tree to convert.
+    :param variables: The variables present in the statement.
+    :return: The number of variables, the number of clauses and a generator yielding every clause as a list of
+        literals which are the numbers of variables negated if the variable has to be false.
+    """
+    numbers = {variable: idx + 1 for idx, variable in enumerate(variables)}
+    nodes = get_nodes(tree)
+    variable_count = len(variables)
+    clause_count = 1
+    for node in nodes:
+        operator = node[0]
+        if operator in (TRUE, FALSE):
+            variable_count += 1
+            clause_count += 1
+        elif operator in (XOR, UNEQUAL, EQUAL):
+            variable_count += 1
+            clause_count += 4
+        elif operator not in (NORMAL, NOT):
+            variable_count += 1
+            clause_count += 3
+
+    def iter_clauses():
+        literals = {}
+        auxiliary = len(variables)
+        for node in nodes:
+            operator = node[0]
+            if operator == NORMAL:
+                literals[id(node)] = numbers[node[1]]
+            elif operator == NOT:
+                literals[id(node)] = -literals[id(node[1])]
+            else:
+                auxiliary += 1
+                literals[id(node)] = auxiliary
+                if operator in (TRUE, FALSE):
+                    yield [auxiliary if operator == TRUE else -auxiliary]
+                else:
+                    a = literals[id(node[1][0])]
+                    b = literals[id(node[1][1])]
+                    yield from get_tseitin_clauses(operator, auxiliary, a, b)
+        yield [literals[id(tree)]]
+
+    return variable_count, clause_count, iter_clauses()
+
+
+def iter_dimacs(tree, variables):
+    """ Generates the conjunctive normal form create_tseitin_cnf returns in the DIMACS format line by line
+
+    Comments at the start list the number of every variable of the statement.
+
+    :param tree: The tree to convert.
+    :param variables: The variables present in the statement.
+    :return: A generator yielding every line including its line break.
+    """
+    variable_count, clause_count, clauses = create_tseitin_cnf(tree, variables)
+    for idx, variable in enumerate(variables):
+        yield f"c {idx + 1} {variable}\n"
+    yield f"p cnf {variable_count} {clause_count}\n"
+    for clause in clauses:
+        yield " ".join(map(str, clause)) + " 0\n"
+
+
+def solve_cnf(variable_count, clauses, cancel=None):
+    """ Searches for an assignment satisfying a conjunctive normal form using the DPLL algorithm
+
+    Every clause watches two of its literals which are not false so a clause is only looked at once one of them
+    becomes false. Variables are tried as false first and the last decision which was not flipped yet is flipped on
+    a conflict.
+
+    :param variable_count: The number of variables.
+    :param clauses: The clauses as returned by create_tseitin_cnf.
+    :param cancel: A threading.Event which stops the search by raising a CancelledException once it is set.
+    :return: A list of the values of all variables in the order of their numbers or None if it is not satisfiable.
+    """
+    # 1 is true, -1 false and 0 not assigned yet, index 0 is not used
+    values = [0] * (variable_count + 1)
+    # the clauses watching a literal are stored at 2 * variable for positive and 2 * variable + 1 for negative ones
+    watches = [[] for _ in range(2 * variable_count + 2)]
+    database = []
+    trail = []
+
+    def value(literal):
+        return values[literal] if literal > 0 else -values[-literal]
+
+    def assign(literal):
+        values[abs(literal)] = 1 if literal > 0 else -1
+        trail.append(literal)
+
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            # a clause containing a variable and its negation is always true
+            continue
+        if not clause:
+            return None
+        if len(clause) == 1:
+            if value(clause[0]) == -1:
+                return None
+            if not value(clause[0]):
+                assign(clause[0])
+            continue
+        for literal in clause[:2]:
+            watches[2 * abs(literal) + (literal < 0)].append(len(database))
+        database.append(clause)
+
+    head = 0
+    # the length of the trail before, the literal and if it was flipped already for every decision
+    decisions = []
+    next_variable = 1
+    while True:
+        conflict = False
+        while head < len(trail) and not conflict:
+            false_literal = -trail[head]
+            head += 1
+            watching = watches[2 * abs(false_literal) + (false_literal < 0)]
+            kept = []
+            for position, idx in enumerate(watching):
+                clause = database[idx]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if value(clause[0]) == 1:
+                    kept.append(idx)
+                    continue
+                for other in range(2, len(clause)):
+                    if value(clause[other]) != -1:
+                        clause[1], clause[other] = clause[other], clause[1]
+                        watches[2 * abs(clause[1]) + (clause[1] < 0)].append(idx)
+                        break
+                else:
+                    kept.append(idx)
+                    if value(clause[0]) == -1:
+                        conflict = True
+                        kept.extend(watching[position + 1:])
+                        break
+                    assign(clause[0])
+            watches[2 * abs(false_literal) + (false_literal < 0)] = kept
+
+        if conflict:
+            while decisions and decisions[-1][2]:
+                decisions.pop()
+            if not decisions:
+                return None
+            length, literal, _ = decisions.pop()
+            for undone in trail[length:]:
+                values[abs(undone)] = 0
+            del trail[length:]
+            head = length
+            next_variable = 1
+            decisions.append((length, -literal, True))
+            assign(-literal)
+            continue
+
+        if cancel is not None and cancel.is_set():
+            raise CancelledException("")
+        while next_variable <= variable_count and values[next_variable]:
+            next_variable += 1
+        if next_variable > variable_count:
+            return [value == 1 for value in values[1:]]
+        decisions.append((len(trail), -next_variable, False))
+        assign(-next_variable)
+
+
+def find_satisfying_assignment(tree, variables, cancel=None):
+    """ Searches for values of the variables which make a method tree true using its Tseitin conjunctive normal form
+
+    :param tree: The tree to search.
+    :param variables: The variables present in the statement.
+    :param cancel: A threading.Event which stops the search by raising a CancelledException once it is set.
+    :return: A dictionary mapping every variable to its value or None if the tree is not satisfiable.
+    """
+    variable_count, _, clauses = create_tseitin_cnf(tree, variables)
+    model = solve_cnf(variable_count, clauses, cancel)
+    if model is None:
+        return None
+    return dict(zip(variables, model))
+
+
+def reconstruct_from_tree(tree, first=True):
+    """ Creates a readable statement from a method tree
+
+    Uses an explicit stack instead of recursion so deep trees can be reconstructed as well.
+
+    :param tree: The tree to reconstruct.
+    :param first: If the tree is the outermost one in which case it is not put in brackets.
+    :return: The reconstructed statement.
+    """
+    pieces = []
+    stack = [(tree, first)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            pieces.append(item)
+            continue
+
+        node, first = item
+        operator = node[0]
+        if operator == NORMAL:
+            pieces.append(node[1])
+
+        elif operator == NOT:
+            pieces.append(NOT_SIGN)
+            stack.append((node[1], False))
+
+        elif operator in (TRUE, FALSE):
+            pieces.append(globals()[f"{operator.__name__}_SIGN"])
+
+        else:
+            if not first:
+                pieces.append("(")
+                stack.append(")")
+            stack.append((node[1][1], False))
+            stack.append(f" {globals()[f'{operator.__name__}_SIGN']} ")
+            stack.append((node[1][0], False))
+    return "".join(pieces)
+
+
+# used instead of a stage of SolverMetrics when no metrics are collected
+NO_STAGE = contextlib.nullcontext()
+# the number of functions listed in the profile of a SolverMetrics report
+PROFILE_LINES = 20
+
+
+class SolverMetrics:
+    """ Collects how long every stage of solving statements takes and how big the statements and tables are
+
+    One instance can be passed to multiple calls in which case all values add up. Times are in seconds.
+
+    :param callback: A function called with the name and the time of every stage once it finished, if any.
+    :param profile: If the calls should be profiled using cProfile.
+    :param trace_memory: If the peak memory used should be measured using tracemalloc.
+    """
+
+    def __init__(self, callback=None, profile=False, trace_memory=False):
+        self.callback = callback
+        self.stages = {}
+        self.counts = {}
+        self.peaks = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0) + elapsed
+            if self.callback is not None:
+                self.callback(name, elapsed)
+
+    @contextlib.contextmanager
+    def collect(self):
+        """ Turns on profiling and memory tracing if they were asked for while inside the context """
+        if self.profiler is not None:
+            self.profiler.enable()
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if tracing:
+                self.peak("memory", tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            if self.profiler is not None:
+                self.profiler.disable()
+
+    def add(self, name, amount=1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def peak(self, name, value):
+        self.peaks[name] = max(self.peaks.get(name, value), value)
+
+    def merge(self, other):
+        """ Adds all values of other to these metrics, profiles are not merged
+
+        :param other: The SolverMetrics to add.
+        :return: Nothing.
+        """
+        for name, elapsed in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0) + elapsed
+        for name, amount in other.counts.items():
+            self.add(name, amount)
+        for name, value in other.peaks.items():
+            self.peak(name, value)
+
+    def report(self):
+        """ Returns a readable summary of all values with the slowest stages first
+
+        :return: The summary.
+        """
+        lines = [f"{name}: {elapsed:.6f}s" for name, elapsed in sorted(self.stages.items(), key=lambda x: -x[1])]
+        lines += [f"{name}: {amount}" for name, amount in sorted(self.counts.items())]
+        lines += [f"peak {name}: {value}" for name, value in sorted(self.peaks.items())]
+        if self.profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            lines.append(stream.getvalue())
+        return "\n".join(lines)
+
+
+def get_stage(metrics, name):
+    """ Returns the context timing the stage name in metrics, or one doing nothing if metrics is None
+
+    :param metrics: The SolverMetrics to time the stage in, if any.
+    :param name: The name of the stage.
+    :return: The context manager.
+    """
+    return metrics.stage(name) if metrics is not None else NO_STAGE
+
+
+def verbosity_print(string, verbosity):
+    if verbosity:
+        print(string)
+
+
+def prepare_method_tree(string, pre_process=True, optimize=True, verbosity=False, metrics=None):
+    """ Polishes, checks, parses and optimizes the given string without running the resulting tree
+
+    :param string: The string to process.
+    :param pre_process: If the string should be pre processed.
+    :param optimize: If the tree should be optimized, trees with more than OPTIMIZE_MAX_VARIABLES variables never are.
+    :param verbosity: If information should be printed to the console.
+    :param metrics: The SolverMetrics to record every stage in, if any.
+    :return: Any variables found and the method tree.
+    """
+    verbosity_print(f"Original Statement: {string}", verbosity)
+
+    # -- prepare the statement --
+    if pre_process:
+        with get_stage(metrics, "pre_process_statement"):
+            string = pre_process_statement(string)
+    verbosity_print(f"Pre-processed: {string}", verbosity)
+    # TODO: wrap all statements in brackets as to prevent not using operator hierarchy
+
+    # -- create the method tree, which checks for syntax errors --
+    # TODO: check for rogue characters
+    with get_stage(metrics, "create_method_tree"):
+        variables, method_tree = create_method_tree(string)
+    if verbosity:
+        verbosity_print(f"Method Tree: {reconstruct_from_tree(method_tree)}", verbosity)
+
+    # -- optimize the method tree --
+    if optimize and len(variables) <= OPTIMIZE_MAX_VARIABLES:
+        with get_stage(metrics, "optimize_truth_table"):
+            method_tree = optimize_truth_table(method_tree)
+        if verbosity:
+            verbosity_print(f"Optimized Statement: {reconstruct_from_tree(method_tree)}", verbosity)
+    if metrics is not None:
+        metrics.add("statements")
+        metrics.add("variables", len(variables))
+        metrics.add("nodes", len(get_nodes(method_tree)))
+    return variables, method_tree
+
+
+class TruthTable:
+    """ A filled out truth table storing only one bit per row
+
+    The values of the variables are not stored as they follow from the index of a row, the first variable being its
+    highest bit. The results are packed into the bytearray results in which row i is bit i % 8 of byte i // 8 so
+    memoryview(table.results) or numpy.frombuffer(table.results, numpy.uint8) read them without copying. Indexing
+    returns the values of the variables and the result of a row and slicing a list of those rows.
+
+    :param variables: The variables present in the statement.
+    :param tree: The tree the table was created with.
+    :param results: The packed result column.
+    """
+    __slots__ = ("variables", "tree", "results", "row_count")
+
+    def __init__(self, variables, tree, results):
+        self.variables = tuple(variables)
+        self.tree = tree
+        self.results = results
+        self.row_count = 1 << len(self.variables)
+
+    @classmethod
+    def from_column(cls, variables, tree, column):
+        """ Creates a table from a result column as returned by evaluate_method_tree_bitwise
+
+        :param variables: The variables present in the statement.
+        :param tree: The tree the table was created with.
+        :param column: The result column as an integer.
+        :return: The table.
+        """
+        row_count = 1 << len(variables)
+        column &= (1 << row_count) - 1
+        return cls(variables, tree, bytearray(column.to_bytes(max(1, row_count >> 3), "little")))
+
+    def __len__(self):
+        return self.row_count
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.get_row(row) for row in range(*key.indices(self.row_count))]
+        if key < 0:
+            key += self.row_count
+        if not 0 <= key < self.row_count:
+            raise IndexError("truth table index out of range")
+        return self.get_row(key)
+
+    def __iter__(self):
+        # product varies the last variable the fastest which is the order of the rows
+        values = itertools.product((False, True), repeat=len(self.variables))
+        return zip(values, map(self.get_result, range(self.row_count)))
+
+    def get_row(self, row):
+        variable_count = len(self.variables)
+        values = tuple(bool(row >> (variable_count - column - 1) & 1) for column in range(variable_count))
+        return values, self.get_result(row)
+
+    def get_result(self, row):
+        return bool(self.results[row >> 3] >> (row & 7) & 1)
+
+    def count(self):
+        """ Returns the number of rows which are true """
+        return count_bits(int.from_bytes(self.results, "little"))
+
+
+def create_compact_truth_table(tree, variables, engine="bitmask", workers=None, cache=None):
+    """ Evaluates a method tree into a TruthTable without creating the intermediate strings of any row
+
+    Uses the numpy, parallel and gray engines if asked for and evaluates the tree like the bitmask engine otherwise.
+
+    :param tree: The tree to evaluate.
+    :param variables: The variables present in the statement.
+    :param engine: The engine to use, one of ENGINES.
+    :param workers: The number of processes the "parallel" engine uses, defaults to the number of cpus.
+    :param cache: The LRUCache the "gray" engine stores its compiled functions in, defaults to COMPILED_TREES.
+    :return: The table.
+    """
+    if engine == "numpy" and np is not None:
+        column = evaluate_method_tree_numpy(tree, variables, keep=False)[id(tree)]
+        return TruthTable.from_column(variables, tree, int.from_bytes(column.tobytes(), "little"))
+    elif engine == "parallel":
+        results = evaluate_method_tree_parallel(tree, variables, workers, keep=False)
+    elif engine == "gray":
+        return TruthTable.from_column(variables, tree, evaluate_method_tree_gray(tree, variables, cache))
+    else:
+        results = evaluate_method_tree_bitwise(tree, variables, keep=False)
+    return TruthTable.from_column(variables, tree, results[id(tree)])
+
+
+# tables with less variables are evaluated in the current process as starting the workers would take longer
+PARALLEL_MIN_VARIABLES = 16
+# more blocks than workers even out blocks which take longer than others
+PARALLEL_BLOCKS_PER_WORKER = 4
+# marks variables in serialized trees which store the index of the variable instead of its name
+SERIALIZED_VARIABLE = "v"
+
+
+def serialize_method_tree(tree, variables):
+    """ Converts a method tree into a flat list which can be sent to other processes
+
+    Nodes are listed in post order and refer to their children by their position in the list. Variables are stored
+    as their index in variables and gates as their sign.
+
+    :param tree: The tree to serialize.
+    :param variables: The variables present in the statement.
+    :return: The list of all nodes and the list of serialized nodes in the same order.
+    """
+    signs = {gate: sign for sign, gate in OPERATOR_FUNCTIONS.items()}
+    indices = {variable: idx for idx, variable in enumerate(variables)}
+    nodes = get_nodes(tree)
+    positions = {}
+    program = []
+    for node in nodes:
+        operator = node[0]
+        if operator == NORMAL:
+            program.append((SERIALIZED_VARIABLE, indices[node[1]]))
+        elif operator == TRUE:
+            program.append((TRUE_SIGN,))
+        elif operator == FALSE:
+            program.append((FALSE_SIGN,))
+        elif operator == NOT:
+            program.append((NOT_SIGN, positions[id(node[1])]))
+        else:
+            program.append((signs[operator], positions[id(node[1][0])], positions[id(node[1][1])]))
+        positions[id(node)] = len(positions)
+    return nodes, program
+
+
+def deserialize_method_tree(program, variables):
+    """ Rebuilds a method tree from the flat list created by serialize_method_tree
+
+    :param program: The serialized tree as returned by serialize_method_tree.
+    :param variables: The variables present in the statement.
+    :return: The method tree, nodes which were shared before are shared again.
+    """
+    nodes = []
+    for entry in program:
+        sign = entry[0]
+        if sign == SERIALIZED_VARIABLE:
+            nodes.append([NORMAL, variables[entry[1]]])
+        elif sign == TRUE_SIGN:
+            nodes.append([TRUE])
+        elif sign == FALSE_SIGN:
+            nodes.append([FALSE])
+        elif sign == NOT_SIGN:
+            nodes.append([NOT, nodes[entry[1]]])
+        else:
+            nodes.append([OPERATOR_FUNCTIONS[sign], [nodes[entry[1]], nodes[entry[2]]]])
+    return nodes[-1]
+
+
+def evaluate_row_block(program, variable_count, fixed_count, block, keep=True):
+    """ Evaluates a serialized method tree for one contiguous block of rows
+
+    The first fixed_count variables are fixed to the bits of block so only the rows from block << free to
+    (block + 1) << free are evaluated, free being the number of remaining variables.
+
+    :param program: The serialized tree as returned by serialize_method_tree.
+    :param variable_count: The number of variables present in the statement.
+    :param fixed_count: The number of variables fixed for every block.
+    :param block: The index of the block to evaluate.
+    :param keep: If the columns of all nodes should be returned instead of only the column of the root which is the
+        last node of the program.
+    :return: The columns of all nodes for the rows of the block as little endian bytes.
+    """
+    free_count = variable_count - fixed_count
+    full = (1 << (1 << free_count)) - 1
+    columns = [full if (block >> (fixed_count - idx - 1)) & 1 else 0 for idx in range(fixed_count)]
+    columns += generate_truth_masks(range(free_count))
+
+    results = []
+    for node in program:
+        sign = node[0]
+        if sign == SERIALIZED_VARIABLE:
+            res = columns[node[1]]
+        elif sign == TRUE_SIGN:
+            res = full
+        elif sign == FALSE_SIGN:
+            res = 0
+        elif sign == NOT_SIGN:
+            res = full ^ results[node[1]]
+        else:
+            res = apply_bitwise_operator(OPERATOR_FUNCTIONS[sign], results[node[1]], results[node[2]], full)
+        results.append(res)
+    byte_count = max(1, (1 << free_count) >> 3)
+    if not keep:
+        # sending the columns back to the main process takes longer than computing them
+        results = results[-1:]
+    return [res.to_bytes(byte_count, "little") for res in results]
+
+
+def evaluate_method_tree_parallel(tree, variables, workers=None, keep=True):
+    """ Evaluates every node of a method tree for all rows like evaluate_method_tree_bitwise using multiple processes
+
+    The rows are split into contiguous blocks by fixing the first variables. Every worker only receives the
+    serialized tree and the index of its block and the columns of all blocks are joined in order afterwards.
+
+    :param tree: The tree to evaluate.
+    :param variables: The variables present in the statement.
+    :param workers: The number of processes to use, defaults to the number of cpus.
+    :param keep: If the columns of all nodes should be returned, otherwise only the column of the root is returned.
+    :return: A dictionary mapping the id of every node to its column.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    variable_count = len(variables)
+    if workers < 2 or variable_count < PARALLEL_MIN_VARIABLES:
+        return evaluate_method_tree_bitwise(tree, variables, keep)
+
+    # blocks keep at least 8 rows so every block consists of whole bytes
+    fixed_count = min((workers * PARALLEL_BLOCKS_PER_WORKER - 1).bit_length(), variable_count - 3)
+    block_count = 1 << fixed_count
+    nodes, program = serialize_method_tree(tree, variables)
+    with ProcessPoolExecutor(max_workers=min(workers, block_count)) as executor:
+        blocks = list(executor.map(
+            evaluate_row_block,
+            itertools.repeat(program, block_count),
+            itertools.repeat(variable_count, block_count),
+            itertools.repeat(fixed_count, block_count),
+            range(block_count),
+            itertools.repeat(keep, block_count)
+        ))
+    if not keep:
+        nodes = [tree]
+    return {
+        id(node): int.from_bytes(b"".join(block[idx] for block in blocks), "little")
+        for idx, node in enumerate(nodes)
+    }
+
+
+def run_method_tree_parallel(tree, table, variables, workers=None, intermediate=True):
+    """ Fills an empty truth table like run_method_tree does but evaluates the tree in multiple processes
+
+    :param tree: The tree to run.
+    :param table: The truth table to fill and use.
+    :param variables: The variables present in the statement.
+    :param workers: The number of processes to use, defaults to the number of cpus.
+    :param intermediate: If the intermediate strings should be created, otherwise None is stored in their place.
+    :return: The filled out truth table.
+    """
+    results = evaluate_method_tree_parallel(tree, variables, workers, intermediate)
+    return fill_truth_table(tree, table, variables, results, intermediate)
+
+
+# gates whose result does not depend on the order of their operands
+COMMUTATIVE_OPERATORS = (AND, OR, XOR, UNEQUAL, EQUAL, NAND, NOR)
+# canonical variables are characters of the private use area so they can not clash with real variables
+CANONICAL_VARIABLE_START = 0xE000
+TREE_CACHE_SIZE = 128
+TREE_CACHE = LRUCache(TREE_CACHE_SIZE)
+# the columns of bigger tables take up too much memory to keep them around
+TREE_CACHE_MAX_VARIABLES = 16
+
+
+def hash_structure(sign, *children):
+    """ Returns a hash of a node built from its sign and the hashes of its children which is the same in every process
+
+    :param sign: The sign of the node.
+    :param children: The hashes of the children.
+    :return: The hash as bytes.
+    """
+    digest = hashlib.blake2b(sign.encode("utf-8"), digest_size=16)
+    for child in children:
+        digest.update(child)
+    return digest.digest()
+
+
+def canonicalize_method_tree(tree, variables):
+    """ Creates a copy of a method tree which is the same for all trees only differing in the names of their
+    variables or the order of the operands of commutative gates
+
+    The variable at index i of variables is renamed to the i-th canonical variable so the columns of both trees are
+    in the same order. Operands of commutative gates are sorted by a hash of their structure which does not depend
+    on the process so equal statements always get the same canonical tree.
+
+    :param tree: The tree to canonicalize.
+    :param variables: The variables present in the statement.
+    :return: The canonical tree and a dictionary mapping the id of every original node to its copy.
+    """
+    signs = {gate: sign for sign, gate in OPERATOR_FUNCTIONS.items()}
+    names = {variable: chr(CANONICAL_VARIABLE_START + idx) for idx, variable in enumerate(variables)}
+    nodes = {}
+    copies = {}
+    hashes = {}
+    for node in get_nodes(tree):
+        operator = node[0]
+        if operator == NORMAL:
+            copy = [NORMAL, names[node[1]]]
+            key = hash_structure(SERIALIZED_VARIABLE + copy[1])
+        elif operator in (TRUE, FALSE):
+            copy = [operator]
+            key = hash_structure(TRUE_SIGN if operator == TRUE else FALSE_SIGN)
+        elif operator == NOT:
+            child = copies[id(node[1])]
+            copy = [NOT, child]
+            key = hash_structure(NOT_SIGN, hashes[id(child)])
+        else:
+            a = copies[id(node[1][0])]
+            b = copies[id(node[1][1])]
+            if operator in COMMUTATIVE_OPERATORS and hashes[id(b)] < hashes[id(a)]:
+                a, b = b, a
+            copy = [operator, [a, b]]
+            key = hash_structure(signs[operator], hashes[id(a)], hashes[id(b)])
+        copy = intern_node(nodes, copy)
+        hashes[id(copy)] = key
+        copies[id(node)] = copy
+    return copies[id(tree)], copies
+
+
+def get_cached_columns(tree, variables, optimize=True, metrics=None, cache=None, keep=True):
+    """ Returns the columns of the nodes of a method tree reusing the results of trees of the same canonical form
+
+    The result column of the canonical tree is stored in the cache which removes the least recently used entry once
+    it is full. The columns of all other nodes are not stored as they take up far more memory, so the cache is only
+    used if keep is False as they would have to be evaluated anyway otherwise. Trees with more than
+    TREE_CACHE_MAX_VARIABLES variables are not stored. The returned tree is always the tree of the caller so the
+    cache never changes the table, only how fast it is created.
+
+    :param tree: The not yet optimized tree.
+    :param variables: The variables present in the statement.
+    :param optimize: If the tree should be optimized.
+    :param metrics: The SolverMetrics to count cache hits and misses in, if any.
+    :param cache: The LRUCache to store the columns in, defaults to TREE_CACHE.
+    :param keep: If the columns of all nodes should be returned, otherwise only the column of the root is returned.
+    :return: The tree to use, being the given tree if it is not optimized, and a dictionary mapping the id of every
+        of its nodes to its column.
+    """
+    if optimize:
+        tree = optimize_truth_table(tree)
+    if keep:
+        return tree, evaluate_method_tree_bitwise(tree, variables)
+
+    canonical_tree, _ = canonicalize_method_tree(tree, variables)
+    canonical_variables = [chr(CANONICAL_VARIABLE_START + idx) for idx in range(len(variables))]
+    _, program = serialize_method_tree(canonical_tree, canonical_variables)
+    key = len(variables), tuple(program)
+
+    if cache is None:
+        cache = TREE_CACHE
+    column = cache.get(key)
+    if metrics is not None:
+        metrics.add("tree_cache_misses" if column is None else "tree_cache_hits")
+    if column is None:
+        # the variables keep their position so the column is the same for the tree of the caller
+        column = evaluate_method_tree_bitwise(canonical_tree, canonical_variables, keep=False)[id(canonical_tree)]
+        if len(variables) <= TREE_CACHE_MAX_VARIABLES:
+            cache.put(key, column)
+    return tree, {id(tree): column}
+
+
+def create_truth_table(string, pre_process=True, optimize=True, verbosity=False, engine="table", workers=None,
+                       use_cache=False, metrics=None, compact=False, fast=False):
+    """ Collection of functions which polish, check, optimize and parse the given string
+
+    Creates a Solver sharing the module wide caches COMPILED_TREES and TREE_CACHE for every call.
+
+    :param pre_process: If the string should be pre processed.
+    :param optimize: If the tree should be optimized.
+    :param verbosity: If information should be printed to the console.
+    :param string: The string to process.
+    :param engine: The engine used to fill the table, one of ENGINES.
+    :param workers: The number of processes the "parallel" engine uses, defaults to the number of cpus.
+    :param use_cache: If the tree should be optimized and evaluated using get_cached_columns instead of the engine.
+    :param metrics: The SolverMetrics to record the time of every stage, the size of the table and cache hits in.
+    :param compact: If a TruthTable should be returned instead of a filled out truth table. The "table" engine
+        evaluates the tree like the "bitmask" engine in that case.
+    :param fast: If only the results should be computed, the intermediate strings are replaced by None and only
+        created for the rows rendered by get_representational_string or iter_table_rows.
+    :return: The filled out truth table.
+    """
+    solver = Solver(
+        pre_process, optimize, verbosity, engine, workers, use_cache, compact, fast, COMPILED_TREES, TREE_CACHE
+    )
+    return solver.create_truth_table(string, metrics)
+
+
+class Solver:
+    """ Creates truth tables and checks statements using its own options and caches
+
+    A solver only keeps its options and the caches of compiled trees and evaluated columns which lock on every access
+    so one solver can be used by many threads at once. The values read while running the gates are kept per thread
+    in EVALUATION_STATE.
+
+    :param pre_process: If statements should be pre processed.
+    :param optimize: If trees should be optimized.
+    :param verbosity: If information should be printed to the console.
+    :param engine: The engine used to fill tables, one of ENGINES.
+    :param workers: The number of processes the "parallel" engine and solve_many use, defaults to the number of cpus.
+    :param use_cache: If trees should be optimized and evaluated using get_cached_columns instead of the engine.
+    :param compact: If TruthTables should be returned instead of filled out truth tables.
+    :param fast: If only the results should be computed without the intermediate strings.
+    :param compiled_trees: The LRUCache to store compiled trees in, a new one is created by default.
+    :param tree_cache: The LRUCache get_cached_columns stores columns in, a new one is created by default.
+    """
+
+    def __init__(self, pre_process=True, optimize=True, verbosity=False, engine="table", workers=None,
+                 use_cache=False, compact=False, fast=False, compiled_trees=None, tree_cache=None):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        self.pre_process = pre_process
+        self.optimize = optimize
+        self.verbosity = verbosity
+        self.engine = engine
+        self.workers = workers
+        self.use_cache = use_cache
+        self.compact = compact
+        self.fast = fast
+        self.compiled_trees = LRUCache(COMPILED_TREES_SIZE) if compiled_trees is None else compiled_trees
+        self.tree_cache = LRUCache(TREE_CACHE_SIZE) if tree_cache is None else tree_cache
+
+    def create_truth_table(self, string, metrics=None):
+        """ Creates the truth table of a statement like the module function create_truth_table
+
+        :param string: The string to process.
+        :param metrics: The SolverMetrics to record the time of every stage, the size of the table and cache hits in.
+        :return: The filled out truth table and the method tree.
+        """
+        if metrics is None:
+            return self.build_truth_table(string)
+        with metrics.collect():
+            return self.build_truth_table(string, metrics)
+
+    def build_truth_table(self, string, metrics=None):
+        """ Does the work of create_truth_table once any profiling was turned on """
+        if self.use_cache:
+            variables, method_tree = prepare_method_tree(string, self.pre_process, False, self.verbosity, metrics)
+            with get_stage(metrics, "get_cached_columns"):
+                method_tree, results = get_cached_columns(
+                    method_tree, variables, self.optimize, metrics, self.tree_cache, not (self.compact or self.fast)
+                )
+            if self.optimize and self.verbosity:
+                verbosity_print(f"Optimized Statement: {reconstruct_from_tree(method_tree)}", self.verbosity)
+            if self.compact:
+                completed_truth_table = TruthTable.from_column(variables, method_tree, results[id(method_tree)])
+                return record_table_size(completed_truth_table, metrics), method_tree
+            with get_stage(metrics, "generate_truth_values"):
+                truth_table = generate_truth_values(variables)
+            with get_stage(metrics, "fill_truth_table"):
+                completed_truth_table = fill_truth_table(method_tree, truth_table, variables, results, not self.fast)
+            return record_table_size(completed_truth_table, metrics), method_tree
+
+        variables, method_tree = prepare_method_tree(
+            string, self.pre_process, self.optimize, self.verbosity, metrics
+        )
+        engine = self.engine
+        if self.compact:
+            with get_stage(metrics, "create_compact_truth_table"):
+                completed_truth_table = create_compact_truth_table(
+                    method_tree, variables, engine, self.workers, self.compiled_trees
+                )
+            return record_table_size(completed_truth_table, metrics), method_tree
+
+        # -- parse the statement --
+        with get_stage(metrics, "generate_truth_values"):
+            truth_table = generate_truth_values(variables)
+        intermediate = not self.fast
+        with get_stage(metrics, "run_method_tree"):
+            if engine == "bitmask":
+                completed_truth_table = run_method_tree_bitwise(method_tree, truth_table, variables, intermediate)
+            elif engine == "numpy" and np is not None:
+                completed_truth_table = run_method_tree_numpy(method_tree, truth_table, variables, intermediate)
+            elif engine == "parallel":
+                completed_truth_table = run_method_tree_parallel(
+                    method_tree, truth_table, variables, self.workers, intermediate
+                )
+            elif engine == "gray":
+                completed_truth_table = run_method_tree_gray(
+                    method_tree, truth_table, variables, intermediate, self.compiled_trees
+                )
+            else:
+                completed_truth_table = run_method_tree(
+                    method_tree, truth_table, variables, True, metrics, intermediate, self.compiled_trees
+                )
+        return record_table_size(completed_truth_table, metrics), method_tree
+
+    def iter_truth_table(self, string):
+        """ Lazily generates the rows of the truth table like the module function iter_truth_table
+
+        :param string: The string to process.
+        :return: A generator yielding the values of the variables, the intermediate string and the result of every
+            row.
+        """
+        variables, method_tree = prepare_method_tree(string, self.pre_process, self.optimize, self.verbosity)
+        yield from iter_method_tree_rows(method_tree, variables, self.compiled_trees)
+
+    def check(self, string, mode="sat", cancel=None):
+        """ Answers a single question about a statement like the module function check
+
+        No table is created so only pre_process is used, the other options and the caches of the solver are not.
+
+        :param string: The string to process.
+        :param mode: One of CHECK_MODES.
+        :param cancel: A threading.Event which stops the search by raising a CancelledException once it is set.
+        :return: The answer.
+        """
+        return check(string, mode, self.pre_process, cancel)
+
+    def solve_statement(self, string):
+        """ Creates the truth table of a statement returning any custom exception raised instead of raising it
+
+        :param string: The string to process.
+        :return: The filled out truth table and the method tree or the exception raised.
+        """
+        try:
+            return self.create_truth_table(string)
+        except SolverException as e:
+            return e
+
+    def solve_many(self, formulas):
+        """ Creates the truth tables of many statements using multiple processes
+
+        All statements are pre processed first so statements which only differ in their aliases or spacing are
+        parsed and run only once. The distinct statements are spread across workers processes, less than 2 workers
+        solve all statements in the current process. Every option of the solver is used but only statements solved
+        in the current process use its caches as other processes have their own.
+
+        :param formulas: The strings to process.
+        :return: A list containing the truth table and the method tree, or the SolverException raised, for every
+            formula in the same order. Equal statements share the same result.
+        """
+        workers = self.workers
+        if workers is None:
+            workers = os.cpu_count() or 1
+        statements = [pre_process_statement(formula) if self.pre_process else formula for formula in formulas]
+        # dictionaries keep their insertion order so every distinct statement keeps the position it first appeared at
+        distinct = list(dict.fromkeys(statements))
+        count = len(distinct)
+        if workers < 2 or count < 2:
+            # the statements are pre processed already, the copy shares the caches of this solver
+            solver = Solver(
+                False, self.optimize, self.verbosity, self.engine, self.workers, self.use_cache, self.compact,
+                self.fast, self.compiled_trees, self.tree_cache
+            )
+            solved = [solver.solve_statement(statement) for statement in distinct]
+        else:
+            options = False, self.optimize, self.engine, self.use_cache, self.compact, self.fast
+            solved = []
+            with ProcessPoolExecutor(max_workers=min(workers, count)) as executor:
+                # trees are sent back serialized as pickling a deeply nested tree exceeds the recursion limit
+                for result in executor.map(
+                    solve_serialized_statement,
+                    distinct,
+                    *(itertools.repeat(option, count) for option in options),
+                    chunksize=max(1, count // (workers * PARALLEL_BLOCKS_PER_WORKER))
+                ):
+                    if not isinstance(result, SolverException):
+                        table, variables, program = result
+                        tree = deserialize_method_tree(program, variables)
+                        if isinstance(table, TruthTable):
+                            table.tree = tree
+                        result = table, tree
+                    solved.append(result)
+        results = dict(zip(distinct, solved))
+        return [results[statement] for statement in statements]
+
+
+def record_table_size(table, metrics):
+    if metrics is not None:
+        if isinstance(table, TruthTable):
+            metrics.add("rows", len(table))
+            metrics.peak("table_bytes", len(table.results))
+        else:
+            rows = len(table[-1])
+            metrics.add("rows", rows)
+            metrics.peak("table_cells", rows * len(table))
+    return table
+
+
+def solve_statement(string, pre_process=True, optimize=True, engine="table", use_cache=False, compact=False,
+                    fast=False):
+    """ Creates the truth table of a statement returning any custom exception raised instead of raising it
+
+    :param string: The string to process.
+    :param pre_process: If the string should be pre processed.
+    :param optimize: If the tree should be optimized.
+    :param engine: The engine used to fill the table, one of ENGINES.
+    :param use_cache: If the tree should be optimized and evaluated using get_cached_columns instead of the engine.
+    :param compact: If a TruthTable should be returned instead of a filled out truth table.
+    :param fast: If only the results should be computed without the intermediate strings.
+    :return: The filled out truth table and the method tree or the exception raised.
+    """
+    solver = Solver(
+        pre_process, optimize, False, engine, None, use_cache, compact, fast, COMPILED_TREES, TREE_CACHE
+    )
+    return solver.solve_statement(string)
+
+
+def solve_serialized_statement(string, pre_process=True, optimize=True, engine="table", use_cache=False,
+                               compact=False, fast=False):
+    """ Creates the truth table of a statement like solve_statement but returns the method tree serialized
+
+    Pickling nests one call per level of a tree so deep trees can not be sent between processes as they are, the
+    flat list returned by serialize_method_tree can. deserialize_method_tree rebuilds the tree.
+
+    :param string: The string to process.
+    :param pre_process: If the string should be pre processed.
+    :param optimize: If the tree should be optimized.
+    :param engine: The engine used to fill the table, one of ENGINES.
+    :param use_cache: If the tree should be optimized and evaluated using get_cached_columns instead of the engine.
+    :param compact: If a TruthTable should be returned instead of a filled out truth table.
+    :param fast: If only the results should be computed without the intermediate strings.
+    :return: The filled out truth table without its tree, the variables and the serialized method tree or the
+        exception raised.
+    """
+    result = solve_statement(string, pre_process, optimize, engine, use_cache, compact, fast)
+    if isinstance(result, SolverException):
+        return result
+    table, tree = result
+    if isinstance(table, TruthTable):
+        variables = table.variables
+        table = TruthTable(variables, None, table.results)
+    else:
+        # the last column holds the results, every other column starts with the name of its variable
+        variables = [column[0] for column in table[:-1]]
+    return table, variables, serialize_method_tree(tree, variables)[1]
+
+
+def solve_many(formulas, workers=None, pre_process=True, optimize=True, engine="table", use_cache=False,
+               compact=False, fast=False):
+    """ Creates the truth tables of many statements using multiple processes like Solver.solve_many
+
+    :param formulas: The strings to process.
+    :param workers: The number of processes to use, defaults to the number of cpus. Less than 2 solves all
+        statements in the current process.
+    :param pre_process: If the strings should be pre processed.
+    :param optimize: If the trees should be optimized.
+    :param engine: The engine used to fill the tables, one of ENGINES.
+    :param use_cache: If the trees should be optimized and evaluated using get_cached_columns instead of the engine.
+    :param compact: If TruthTables should be returned instead of filled out truth tables.
+    :param fast: If only the results should be computed without the intermediate strings.
+    :return: A list containing the truth table and the method tree, or the SolverException raised, for every
+        formula in the same order. Equal statements share the same result.
+    """
+    solver = Solver(
+        pre_process, optimize, False, engine, workers, use_cache, compact, fast, COMPILED_TREES, TREE_CACHE
+    )
+    return solver.solve_many(formulas)
+
+
+def iter_method_tree_rows(tree, variables, cache=None):
+    """ Runs a method tree row by row without storing any of the rows
+
+    :param tree: The tree to run.
+    :param variables: The variables present in the statement.
+    :param cache: The LRUCache to store the compiled tree in, defaults to COMPILED_TREES.
+    :return: A generator yielding the values of the variables, the intermediate string and the result of every row
+        in the same order as the rows of a truth table.
+    """
+    evaluate = compile_method_tree(tree, variables, cache=cache)
+    # product varies the last variable the fastest which is the order generate_truth_values uses
+    for values in itertools.product((False, True), repeat=len(variables)):
+        res, s = evaluate(*values)
+        yield values, s, res
+
+
+def iter_until_cancelled(rows, cancel, expression):
+    """ Passes on rows until an event is set
+
+    :param rows: The rows to pass on.
+    :param cancel: A threading.Event which stops the rows by raising a CancelledException once it is set.
+    :param expression: The statement the rows belong to.
+    :return: A generator yielding the rows.
+    """
+    for row in rows:
+        if cancel.is_set():
+            raise CancelledException(expression)
+        yield row
+
+
+def iter_truth_table(string, pre_process=True, optimize=True):
+    """ Lazily generates the rows of the truth table create_truth_table would return
+
+    The memory used does not depend on the number of rows as only the current row is kept. The optimizer keeps a
+    column of all rows for every node so statements with more than OPTIMIZE_MAX_VARIABLES variables are not optimized.
+
+    :param string: The string to process.
+    :param pre_process: If the string should be pre processed.
+    :param optimize: If the tree should be optimized.
+    :return: A generator yielding the values of the variables, the intermediate string and the result of every row.
+    """
+    yield from Solver(pre_process, optimize, compiled_trees=COMPILED_TREES).iter_truth_table(string)
+
+
+def iter_table_rows(table, tree=None):
+    """ Returns the rows of a filled out truth table in the format iter_method_tree_rows uses
+
+    The intermediate strings of a TruthTable and of tables created in fast mode are created on the fly for the rows
+    which are actually iterated over.
+
+    :param table: The table to get the rows of.
+    :param tree: The tree the table was created with, needed for tables created in fast mode.
+    :return: A generator yielding the values of the variables, the intermediate string and the result of every row.
+    """
+    if isinstance(table, TruthTable):
+        evaluate = compile_method_tree(table.tree, table.variables)
+        for values, res in table:
+            yield values, evaluate(*values)[1], res
+        return
+    variable_count = len(table) - 1
+    evaluate = None
+    for step, (s, res) in enumerate(table[variable_count]):
+        values = tuple(table[column][step + 1] for column in range(variable_count))
+        if s is None:
+            if evaluate is None:
+                evaluate = compile_method_tree(tree, [table[column][0] for column in range(variable_count)])
+            s = evaluate(*values)[1]
+        yield values, s, res
+
+
+def boolean_to_string(value):
+    return "1" if value else "0"
+
+
+def iter_representational_string(variables, tree, rows):
+    """ Generates the string get_representational_string returns line by line
+
+    :param variables: The variables present in the statement.
+    :param tree: The tree the rows were created with.
+    :param rows: The rows as yielded by iter_method_tree_rows.
+    :return: A generator yielding every line including its line break.
+    """
+    variable_count = len(variables)
+
+    to_print = "|"
+    for i in range(variable_count):
+        to_print += f"  {variables[i]}  {' ' if i >= variable_count - 1 else ''}|"
+    recon = reconstruct_from_tree(tree)
+    to_print += f" {recon} |  #  |"
+    yield f"{to_print}\n"
+    yield f"{len(to_print) * '-'}\n"
+
+    for values, inter, res in rows:
+        to_print = ""
+        for j in range(variable_count):
+            to_print += f"   {boolean_to_string(values[j])}  {' ' if j >= variable_count - 1 else ''}"
+        to_print += f"|{inter}|  {boolean_to_string(res)}  |"
+        yield to_print + "\n"
+
+
+def get_representational_string(table, tree):
+    """ Returns a string which represents a given truth table
+
+    :param table: The table to represent, either a filled out truth table or a TruthTable.
+    :param tree: The tree the table was created with.
+    :return: The generated string.
+    """
+    if isinstance(table, TruthTable):
+        variables = table.variables
+    else:
+        variables = []
+        for i in range(len(table) - 1):
+            variables.append(table[i][0])
+    return "".join(iter_representational_string(variables, tree, iter_table_rows(table, tree)))
+
+
+# the default size all files of a ResultCache may take up together in bytes
+RESULT_CACHE_SIZE = 100 * 1024 * 1024
+RESULT_CACHE_SUFFIX = ".txt.gz"
+
+
+class ResultCache:
+    """ Stores rendered truth tables compressed on disk keyed by the hash of their pre-processed statement
+
+    Files are written to a temporary file first which then replaces the cached file so other processes never read a
+    partially written table. Reading a table updates the modification time of its file and once all files are
+    bigger than max_size the least recently used ones are removed.
+    """
+
+    def __init__(self, directory="cached", max_size=RESULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, statement, optimize=True):
+        """ Returns the path a table is cached at
+
+        :param statement: The pre-processed statement.
+        :param optimize: If the table was created with an optimized tree.
+        :return: The path of the file.
+        """
+        key = hashlib.sha256(f"{int(optimize)}{statement}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + RESULT_CACHE_SUFFIX)
+
+    def get(self, statement, optimize=True):
+        """ Returns the cached table of a statement
+
+        :param statement: The pre-processed statement.
+        :param optimize: If the table was created with an optimized tree.
+        :return: The rendered table or None if it is not cached.
+        """
+        path = self.get_path(statement, optimize)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                string = f.read()
+            os.utime(path)
+        except (FileNotFoundError, EOFError, gzip.BadGzipFile):
+            return None
+        return string
+
+    def put(self, statement, string, optimize=True):
+        """ Caches the rendered table of a statement and removes the least recently used tables if needed
+
+        :param statement: The pre-processed statement.
+        :param string: The rendered table.
+        :param optimize: If the table was created with an optimized tree.
+        :return: Nothing.
+        """
+        fd, temporary_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(string.encode("utf-8")))
+            os.replace(temporary_path, self.get_path(statement, optimize))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        self.evict()
+
+    def get_entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(RESULT_CACHE_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """ Removes the least recently used tables until all tables fit into max_size
+
+        :return: The number of removed tables.
+        """
+        entries = self.get_entries()
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+        if size > self.max_size:
+            for _, file_size, path in sorted(entries):
+                if size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= file_size
+                removed += 1
+        return removed
+
+    def clear(self):
+        """ Removes all cached tables
+
+        :return: The number of removed tables.
+        """
+        removed = 0
+        for _, _, path in self.get_entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+        return removed
+
+
+def solve(string, optimize=True, mode=None, fast=False, max_rows=None):
+    """ A function which creates a truth table and prints it row by row it also handles all custom exceptions raised
 
     :param string: The string to process.
     :param optimize: If the formula should be optimized.
+    :param mode: One of CHECK_MODES to only print the answer check gives instead of the table.
+    :param fast: If the results of all rows should be computed at once without their intermediate strings which are
+        only created for the printed rows. The number of true rows is printed at the end.
+    :param max_rows: The number of rows to print at most, all rows are printed if None.
     :return: Nothing.
     """
     try:
-        table, tree = create_truth_table(string, verbosity=True, optimize=optimize)
-        print(get_representational_string(table, tree))
+        if mode is not None:
+            print(f"{mode}: {check(string, mode)}")
+            return
+        variables, tree = prepare_method_tree(string, verbosity=True, optimize=optimize)
+        row_count = 1 << len(variables)
+        if fast:
+            table = create_compact_truth_table(tree, variables)
+            rows = iter_table_rows(table)
+        else:
+            rows = iter_method_tree_rows(tree, variables)
+        for line in iter_representational_string(variables, tree, itertools.islice(rows, max_rows)):
+            sys.stdout.write(line)
+        if max_rows is not None and max_rows < row_count:
+            sys.stdout.write(f"... {row_count - max_rows} more rows\n")
+        if fast:
+            sys.stdout.write(f"{table.count()} of {row_count} rows are true\n")
+        sys.stdout.write("\n")
     except SolverException as e:
         sys.stderr.write(e.error_message)
     except BaseException as e:
         traceback.print_exc()
 
 
-def console_solve(optimize=True):
+def console_solve(optimize=True, mode=None, fast=False, max_rows=None):
     while True:
-        solve(input("Formula: "), optimize=optimize)
+        solve(input("Formula: "), optimize=optimize, mode=mode, fast=fast, max_rows=max_rows)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,212 @@
+import random
+
+import pytest
+
+import solver
+
+STATEMENTS = (
+    "a",
+    "-a",
+    "true",
+    "a and b or c",
+    "a xor b xor c",
+    "(a if b) = -(c nand a)",
+    "-(a nor -b) and (c or d) xor a",
+    "(a and true) or (b nor false) if c",
+    "((a = b) xor (c = d)) nand -(a or d)"
+)
+
+
+def count_rows(statement):
+    variables, tree = solver.create_method_tree(solver.pre_process_statement(statement))
+    return bin(solver.evaluate_method_tree_bitwise(tree, variables)[id(tree)]).count("1")
+
+
+def get_column(tree, variables):
+    return solver.evaluate_method_tree_bitwise(tree, variables, keep=False)[id(tree)]
+
+
+def get_row(assignment, variables):
+    # the first variable is the highest bit of the index of a row
+    row = 0
+    for variable in variables:
+        row = row << 1 | assignment[variable]
+    return row
+
+
+def create_statement(rng, depth):
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(("a", "b", "c", "d", "e", "true", "false"))
+    if rng.random() < 0.2:
+        return f"-{create_statement(rng, depth - 1)}"
+    operator = rng.choice(("and", "or", "xor", "nand", "nor", "if", "=", "!="))
+    return f"({create_statement(rng, depth - 1)} {operator} {create_statement(rng, depth - 1)})"
+
+
+def get_random_statements(count=60, seed=5):
+    rng = random.Random(seed)
+    return [create_statement(rng, 4) for _ in range(count)]
+
+
+def get_trees():
+    for statement in STATEMENTS + tuple(get_random_statements()):
+        yield solver.create_method_tree(solver.pre_process_statement(statement))
+
+
+def variable(name):
+    return [solver.NORMAL, name]
+
+
+def test_count_constant_statements():
+    for statement in ("true", "false", "true if true", "-false nand false", "(true xor false) = -true"):
+        assert solver.check(statement, "count") == count_rows(statement)
+
+
+def test_count_mixed_constant_statements():
+    for statement in (
+        "((t and -p) if t if -q and false and false xor true)",
+        "p and true",
+        "p or (false and q)",
+        "(p xor true) and (q or false)",
+        "(p nand false) = (q nor true)"
+    ):
+        assert solver.check(statement, "count") == count_rows(statement)
+
+
+def test_parse_known_trees():
+    a, b, c = variable("a"), variable("b"), variable("c")
+    expected = {
+        # operators later in OPERATOR_HIERARCHY bind stronger, operators of the same kind are grouped from the right
+        "a∧b∨c": [solver.AND, [a, [solver.OR, [b, c]]]],
+        "a∨b∧c": [solver.AND, [[solver.OR, [a, b]], c]],
+        "a∧b∧c": [solver.AND, [a, [solver.AND, [b, c]]]],
+        "(a∧b)∧c": [solver.AND, [[solver.AND, [a, b]], c]],
+        "¬a→b": [solver.IF, [[solver.NOT, a], b]],
+        "¬(a↔b)": [solver.NOT, [solver.EQUAL, [a, b]]],
+        "¬¬a": a,
+        "a⊻1": [solver.XOR, [a, [solver.TRUE]]],
+        "((a))⊼0": [solver.NAND, [a, [solver.FALSE]]]
+    }
+    for string, tree in expected.items():
+        variables, parsed = solver.create_method_tree(string)
+        assert parsed == tree, string
+    assert solver.create_method_tree("b∧a∨b")[0] == ["b", "a"]
+
+
+def test_parse_shares_repeated_sub_statements():
+    _, tree = solver.create_method_tree("(a∧b)∨(a∧b)")
+    assert tree[1][0] is tree[1][1]
+
+
+def test_parse_deep_nesting():
+    statement = "a"
+    for idx in range(20000):
+        statement = f"¬({statement}∨b)" if idx % 2 else f"({statement}∧c)"
+    variables, tree = solver.create_method_tree(statement)
+    assert variables == ["a", "c", "b"]
+    assert solver.check(statement, "count", pre_process=False) == count_rows(statement)
+
+
+@pytest.mark.parametrize("string, idx, exception", (
+    ("()", 1, solver.InvalidBracketException),
+    ("a∧()", 3, solver.InvalidBracketException),
+    ("(a∧(b", 0, solver.InvalidBracketException),
+    ("a)", 1, solver.InvalidBracketException),
+    ("a∧", 2, solver.InvalidCharacterException),
+    ("ab", 1, solver.InvalidCharacterException)
+))
+def test_parse_errors(string, idx, exception):
+    with pytest.raises(exception) as info:
+        solver.create_method_tree(string)
+    assert info.value.error_message.split("\n")[1] == " " * idx + "^"
+
+
+def test_engines_match_table():
+    for statement in STATEMENTS + tuple(get_random_statements(20)):
+        expected, _ = solver.create_truth_table(statement)
+        for engine in solver.ENGINES:
+            table, _ = solver.create_truth_table(statement, engine=engine, workers=2)
+            assert table == expected, (statement, engine)
+        results = [result for _, result in expected[-1]]
+        for options in ({"fast": True}, {"fast": True, "use_cache": True}, {"engine": "bitmask", "fast": True}):
+            table, _ = solver.create_truth_table(statement, **options)
+            assert [result for _, result in table[-1]] == results, (statement, options)
+        for options in ({"compact": True}, {"compact": True, "use_cache": True}, {"compact": True, "fast": True}):
+            table, _ = solver.create_truth_table(statement, **options)
+            assert [result for _, result in table[:]] == results, (statement, options)
+        assert [result for _, _, result in solver.iter_truth_table(statement)] == results, statement
+
+
+def test_solve_many_matches_solve_statement():
+    statements = STATEMENTS + ("a ∧ ()", "a and b", "a  and b")
+    for workers in (1, 2):
+        results = solver.solve_many(statements, workers=workers, compact=True)
+        for statement, result in zip(statements, results):
+            expected = solver.solve_statement(statement, compact=True)
+            if isinstance(expected, solver.SolverException):
+                assert result.error_message == expected.error_message
+            else:
+                assert result[0].results == expected[0].results
+                assert result[1] == expected[1]
+
+
+def test_solve_many_sends_deep_trees_back():
+    statement = "a"
+    for idx in range(20000):
+        statement = f"¬({statement}∨b)" if idx % 2 else f"({statement}∧c)"
+    deep, simple, invalid = solver.solve_many([statement, "a∧b", "a∧()"], workers=2, pre_process=False, fast=True)
+    assert solver.get_nodes(deep[1])[-1] is deep[1]
+    assert simple[0] == solver.create_truth_table("a∧b", pre_process=False, fast=True)[0]
+    assert isinstance(invalid, solver.InvalidBracketException)
+
+
+def test_optimizer_matches_bitmask():
+    for variables, tree in get_trees():
+        assert get_column(solver.optimize_truth_table(tree), variables) == get_column(tree, variables)
+
+
+def test_minimized_forms_match_bitmask():
+    for variables, tree in get_trees():
+        column = get_column(tree, variables)
+        dnf, cnf = solver.minimize_method_tree(tree, variables)
+        assert get_column(dnf, variables) == column
+        assert get_column(cnf, variables) == column
+
+
+def test_bdd_matches_bitmask():
+    for variables, tree in get_trees():
+        column = get_column(tree, variables)
+        for order in (variables, variables[::-1]):
+            bdd, root = solver.create_bdd(tree, variables, order)
+            assert bdd.count_satisfying(root) == bin(column).count("1")
+            rows = list(bdd.iter_rows(root, variables))
+            assert [result for _, result in rows] == [bool(column >> row & 1) for row in range(1 << len(variables))]
+            assignment = bdd.find_satisfying(root)
+            if column == 0:
+                assert assignment is None
+            else:
+                assert column >> get_row(assignment, variables) & 1
+
+
+def test_satisfying_assignment_matches_bitmask():
+    for variables, tree in get_trees():
+        column = get_column(tree, variables)
+        assignment = solver.find_satisfying_assignment(tree, variables)
+        if column == 0:
+            assert assignment is None
+        else:
+            assert column >> get_row(assignment, variables) & 1
+
+
+@pytest.mark.parametrize("table_max_variables, bdd_max_nodes", ((20, 1 << 20), (0, 1 << 20), (0, 2)))
+def test_check_matches_bitmask(monkeypatch, table_max_variables, bdd_max_nodes):
+    # lowering the limits makes small statements take the paths meant for big ones
+    monkeypatch.setattr(solver, "CHECK_TABLE_MAX_VARIABLES", table_max_variables)
+    monkeypatch.setattr(solver, "CHECK_BDD_MAX_NODES", bdd_max_nodes)
+    for statement in STATEMENTS + tuple(get_random_statements()):
+        variables, tree = solver.create_method_tree(solver.pre_process_statement(statement))
+        column = get_column(tree, variables)
+        row_count = 1 << len(variables)
+        assert solver.check(statement, "sat") == (column != 0), statement
+        assert solver.check(statement, "taut") == (column == (1 << row_count) - 1), statement
+        assert solver.check(statement, "count") == bin(column).count("1"), statement